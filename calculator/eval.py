@@ -0,0 +1,78 @@
+# calculator/eval.py
+# Headless evaluation: python -m calculator.eval [file] [--angle deg] [--format sci] [--fix 2] [--mod 7] [--json]
+import argparse
+import json
+import math
+import sys
+from .logic.evaluator import evaluate_expression
+
+# Wider integers can't be written as JSON numbers (Python refuses decimal
+# conversion past 4300 digits), so their raw value is left out
+MAX_JSON_INT_BITS = 10000
+
+def json_raw_value(raw):
+    # raw_value as a JSON-safe number, or None; 'value' always has the formatted result
+    if isinstance(raw, int) and abs(raw).bit_length() <= MAX_JSON_INT_BITS:
+        return raw
+    if isinstance(raw, float) and math.isfinite(raw):
+        return raw
+    return None
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m calculator.eval",
+        description="Evaluate calculator expressions, one per line, without starting the GUI."
+    )
+    parser.add_argument("file", nargs="?", help="file with one expression per line (default: stdin)")
+    parser.add_argument("--angle", choices=["deg", "rad", "grd"], default="rad", help="angle mode (DRG)")
+    parser.add_argument("--format", choices=["flo", "sci", "eng"], default="flo", help="output format (SCI/ENG)")
+    parser.add_argument("--fix", type=int, choices=range(10), metavar="{0..9}", help="fixed decimal places (FIX)")
+    parser.add_argument("--mod", default=None, help="modulus applied to integer results (MOD)")
+    parser.add_argument("--hyp", action="store_true", help="use hyperbolic trig functions (HYP)")
+    parser.add_argument("--json", action="store_true", help="write one JSON object per line")
+    return parser.parse_args(argv)
+
+def evaluate_stream(lines, output, angle_mode="rad", output_format="flo", decimal_places=None,
+                    modulus=None, hyp=False, as_json=False):
+    # Results are written as each line is read, so memory use doesn't grow with the input
+    ans = 0
+    for line in lines:
+        expression = line.rstrip("\r\n")
+        result = evaluate_expression(expression,
+                                     angle_mode=angle_mode,
+                                     output_format=output_format,
+                                     decimal_places=decimal_places,
+                                     ans=ans,
+                                     hyp=hyp,
+                                     modulus=modulus)
+
+        value = str(result['value'])
+        error = value[len("Error: "):] if result['raw_value'] is None and value.startswith("Error: ") else None
+        if error is None:
+            # Like the = key, a successful result becomes the next line's Ans
+            ans = result['raw_value']
+
+        if as_json:
+            record = {
+                'expression': expression,
+                'value': None if error else value,
+                'raw_value': json_raw_value(result['raw_value']),
+                'error': error
+            }
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            output.write(value + "\n")
+
+def main(argv=None):
+    args = parse_args(argv)
+    settings = dict(angle_mode=args.angle, output_format=args.format, decimal_places=args.fix,
+                    modulus=args.mod, hyp=args.hyp, as_json=args.json)
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            evaluate_stream(f, sys.stdout, **settings)
+    else:
+        evaluate_stream(sys.stdin, sys.stdout, **settings)
+
+if __name__ == "__main__":
+    main()
@@ -1,102 +1,43 @@
+import decimal
 import math
-import re
-from .prob import factorial, permutation, combination, rand, randi
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from itertools import repeat
+from .parser import parse
+from .prob import factorial, permutation, combination, rand, randi, MAX_RESULT_BITS
 from .coordinate import rectangular_to_polar_r, rectangular_to_polar_theta, polar_to_rectangular_x, polar_to_rectangular_y
 
 def evaluate_expression(expression: str, angle_mode: str = "rad", output_format: str = "flo", 
-                       decimal_places: int = None, ans: str = "0", hyp: bool = False,
-                       rand_seed=None, modulus=None) -> dict:
+                       decimal_places: int = None, ans=0, hyp: bool = False,
+                       rand_seed=None, modulus=None, registers=None) -> dict:
     try:
-        # Check for memory storage operations (►a, ►b, etc.)
-        store_match = re.search(r'►([a-e]|r)$', expression)
-        store_to_memory = None
+        # Parse and compile the expression, or reuse the cached code object
+        code, parsed = compile_expression(expression.strip())
+        store_to_memory = parsed.store_to
         
-        if store_match:
-            # Extract which memory location to store to
-            store_to_memory = store_match.group(1)
-            # Remove the ►letter part for evaluation
-            expression = expression[:store_match.start()]
-        
-        # CHANGE ORDER: First replace "ans" with the value of ans
-        print(f"Ans: {ans}")
-        print(f"Expression before replacing Ans: {expression}")
-        expression = expression.replace("Ans", ans)
-        print(f"Expression after replacing Ans: {expression}")
-        print(f"Ans: {ans}")
-            
-        # THEN check for conversion operators and fraction types
-        # Support both Unicode and ASCII versions of the symbol
-        convert_to_fraction = "►f↔d" in expression or ">f<>d" in expression
-        convert_fraction_format = "►A B/C↔D/E" in expression or ">A B/C<>D/E" in expression
-        has_mixed_fraction = "┘" in expression
-        has_simple_fraction = bool(re.search(r'^\d+/\d+$|[^\d\/]\d+/\d+', expression.replace("┘", "")))
+        # Conversion operators and fraction types come straight from the parse
+        convert_to_fraction = parsed.conversion == "f<>d"
+        convert_fraction_format = parsed.conversion == "abc<>de"
+        convert_to_dms = parsed.conversion == "dms"
+        has_mixed_fraction = parsed.has_mixed_fraction
         
         # Determine conversion directions
         convert_direction_f_d = "to_decimal" if (convert_to_fraction and has_mixed_fraction) else "to_fraction"
         convert_direction_mixed = "to_improper" if (convert_fraction_format and has_mixed_fraction) else "to_mixed"
         
-        # First normalize division symbols for consistent processing
-        expression = expression.replace("÷", "/")
-        
-        # Check for ►DMS conversion
-        convert_to_dms = "►DMS" in expression
-        if convert_to_dms:
-            # Remove the ►DMS part for evaluation
-            expression = expression.replace("►DMS", "")
-        
-        # Process mixed fractions in input before evaluation
-        if has_mixed_fraction:
-            processed_expr = parse_mixed_fractions(expression)
-        else:
-            processed_expr = expression
-            
-        # Remove conversion operators before processing
-        processed_expr = processed_expr.replace("►f↔d", "").replace(">f<>d", "")
-        processed_expr = processed_expr.replace("►A B/C↔D/E", "").replace(">A B/C<>D/E", "")
-        
-        # Process the expression as before
-        processed_expr = process_expression(processed_expr, angle_mode)
-        processed_expr = processed_expr.replace("math.math.", "math.")
-        processed_expr = balance_parentheses(processed_expr)
-        
-        if angle_mode != "rad" or hyp:
-            processed_expr = apply_angle_mode_conversion(processed_expr, angle_mode, hyp)
-        
-        # Evaluate the processed expression
-        eval_namespace = {
-            "math": math,
-            "factorial": factorial,
-            "permutation": permutation,
-            "combination": combination,
-            "rand": lambda: rand(seed=rand_seed),
-            "randi": lambda min_val=0, max_val=100: randi(min_val, max_val, seed=rand_seed),
-            "abs": abs
-        }
-        
-        eval_namespace.update({
-            "dms_to_decimal": lambda d, m, s, mode: dms_to_decimal(d, m, s, mode),
-            "rad_to_angle_mode": lambda v, mode: rad_to_angle_mode(v, mode),
-            "grad_to_angle_mode": lambda v, mode: grad_to_angle_mode(v, mode)
-        })
-        
-        eval_namespace.update({
-            "rectangular_to_polar_r": rectangular_to_polar_r,
-            "rectangular_to_polar_theta": lambda x, y, mode: rectangular_to_polar_theta(x, y, mode),
-            "polar_to_rectangular_x": lambda r, theta, mode: polar_to_rectangular_x(r, theta, mode),
-            "polar_to_rectangular_y": lambda r, theta, mode: polar_to_rectangular_y(r, theta, mode)
-        })
-        
-        result = eval(processed_expr, {"__builtins__": {}}, eval_namespace)
+        # Evaluate the compiled expression against the functions for this mode;
+        # Ans and the memory registers are bound by value, never spliced into the text
+        namespace = build_eval_namespace(angle_mode, hyp, rand_seed)
+        result = eval(code, namespace, build_bindings(ans, registers))
         result = clean_floating_point_errors(result)
         
         # Apply conversions based on flags and direction
         if convert_fraction_format:
             if convert_direction_mixed == "to_improper" and has_mixed_fraction:
                 return mixed_to_improper_fraction(result)
-            elif convert_direction_mixed == "to_mixed" and has_simple_fraction:
-                return decimal_to_mixed_fraction(result)
             elif convert_direction_mixed == "to_mixed":
-                # Default case - attempt to convert to mixed fraction
+                # Simple fractions and plain decimals both become mixed fractions
                 return decimal_to_mixed_fraction(result)
         elif convert_to_fraction and convert_direction_f_d == "to_fraction":
             # Convert decimal to mixed fraction
@@ -111,13 +52,8 @@ def evaluate_expression(expression: str, angle_mode: str = "rad", output_format:
             if isinstance(result, int) or (isinstance(result, float) and result.is_integer()):
                 int_result = int(result)
                 # Check if integer has more than 10 digits - if so, use sci notation
-                if len(str(abs(int_result))) > 10:
-                    exponent = math.floor(math.log10(abs(int_result)))
-                    mantissa = int_result / (10 ** exponent)
-                    if mantissa == int(mantissa):
-                        formatted_result = f"{int(mantissa)}x10^{exponent}"
-                    else:
-                        formatted_result = f"{mantissa:.6g}x10^{exponent}"
+                if abs(int_result) >= 10 ** 10:
+                    formatted_result = format_integer_scientific(int_result)
                 else:
                     formatted_result = str(int_result)
             else:
@@ -137,6 +73,8 @@ def evaluate_expression(expression: str, angle_mode: str = "rad", output_format:
             # Scientific notation: ALWAYS use 1-10 x 10^n format
             if result == 0:
                 formatted_result = "0x10^0"  # Special case for zero
+            elif isinstance(result, int):
+                formatted_result = format_integer_scientific(result)
             else:
                 # Get mantissa between 1 and 10 and the exponent
                 exponent = math.floor(math.log10(abs(result)))
@@ -151,6 +89,8 @@ def evaluate_expression(expression: str, angle_mode: str = "rad", output_format:
             # Engineering notation: ALWAYS use 1-1000 x 10^(3n) format
             if result == 0:
                 formatted_result = "0x10^0"  # Special case for zero
+            elif isinstance(result, int):
+                formatted_result = format_integer_scientific(result, engineering=True)
             else:
                 # Get the exponent
                 exponent = math.floor(math.log10(abs(result)))
@@ -173,7 +113,10 @@ def evaluate_expression(expression: str, angle_mode: str = "rad", output_format:
             if output_format == "flo":
                 # For integers or numbers that can be represented as integers
                 if isinstance(result, int) or (isinstance(result, float) and result.is_integer()):
-                    if decimal_places == 0:
+                    if abs(result) >= 10 ** 10:
+                        # Integers too wide for the display stay in sci notation
+                        formatted_result = format_integer_scientific(int(result), decimal_places)
+                    elif decimal_places == 0:
                         # For FIX 0, just show the integer without decimal point
                         formatted_result = str(int(result))
                     else:
@@ -186,6 +129,8 @@ def evaluate_expression(expression: str, angle_mode: str = "rad", output_format:
             elif output_format == "sci":
                 if result == 0:
                     formatted_result = f"0.{'0' * decimal_places}x10^0"
+                elif isinstance(result, int):
+                    formatted_result = format_integer_scientific(result, decimal_places)
                 else:
                     exponent = math.floor(math.log10(abs(result)))
                     mantissa = result / (10 ** exponent)
@@ -194,6 +139,8 @@ def evaluate_expression(expression: str, angle_mode: str = "rad", output_format:
             elif output_format == "eng":
                 if result == 0:
                     formatted_result = f"0.{'0' * decimal_places}x10^0"
+                elif isinstance(result, int):
+                    formatted_result = format_integer_scientific(result, decimal_places, engineering=True)
                 else:
                     exponent = math.floor(math.log10(abs(result)))
                     eng_exponent = 3 * (exponent // 3)
@@ -240,48 +187,163 @@ def evaluate_expression(expression: str, angle_mode: str = "rad", output_format:
         
         return result_tuple
             
+    except OverflowError:
+        # Refused up front by a size check, or a float that left the representable range
+        return {'value': "Error: too large", 'store_to': None, 'raw_value': None}
     except Exception as e:
         return {'value': f"Error: {str(e)}", 'store_to': None, 'raw_value': None}
 
-def apply_angle_mode_conversion(expr: str, angle_mode: str, hyp: bool = False) -> str:
-    """Apply angle mode conversions to trig functions"""
-    import re
+# Expression names for the memory registers (lowercase e and r are taken by the
+# constant and the radian suffix)
+REGISTER_NAMES = {"a": "A", "b": "B", "c": "C", "d": "D", "e": "E", "r": "R"}
+BOUND_NAMES = ("Ans",) + tuple(REGISTER_NAMES.values())
+
+def build_bindings(ans=0, registers=None) -> dict:
+    bindings = {"Ans": to_number(ans)}
+    for register, name in REGISTER_NAMES.items():
+        bindings[name] = to_number((registers or {}).get(register, 0))
+    return bindings
+
+def to_number(value):
+    # Stored values are normally raw numbers; older saved state kept Ans as display text
+    if isinstance(value, (int, float)):
+        return value
+    text = str(value).strip().replace("x10^", "E").replace("(-)", "-")
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return 0
+
+# Number of (angle mode, hyp, rand seed) namespaces kept around
+NAMESPACE_CACHE_SIZE = 32
+
+@lru_cache(maxsize=NAMESPACE_CACHE_SIZE)
+def build_eval_namespace(angle_mode: str = "rad", hyp: bool = False, rand_seed=None) -> dict:
+    """Globals for evaluating compiled expressions, built once per mode combination and reused"""
+    eval_namespace = {
+        "__builtins__": {},
+        "math": math,
+        "factorial": factorial,
+        "permutation": permutation,
+        "combination": combination,
+        "power": power,
+        "rand": lambda: rand(seed=rand_seed),
+        "randi": lambda min_val=0, max_val=100: randi(min_val, max_val, seed=rand_seed),
+        "abs": abs
+    }
     
-    if hyp:
-        # For hyperbolic functions, just replace trig with hyperbolic equivalents
-        # NO angle conversion needed for hyperbolic functions
-        expr = re.sub(r'math\.sin\((.*?)\)', r'math.sinh(\1)', expr)
-        expr = re.sub(r'math\.cos\((.*?)\)', r'math.cosh(\1)', expr)
-        expr = re.sub(r'math\.tan\((.*?)\)', r'math.tanh(\1)', expr)
-            
-        # For inverse hyperbolic functions - also no angle conversion
-        expr = re.sub(r'math\.asin\((.*?)\)', r'math.asinh(\1)', expr)
-        expr = re.sub(r'math\.acos\((.*?)\)', r'math.acosh(\1)', expr)
-        expr = re.sub(r'math\.atan\((.*?)\)', r'math.atanh(\1)', expr)
-    else:
-        # Standard angle mode conversions for regular trig functions
-        if angle_mode == "deg":
-            # Convert degrees to radians for trig functions
-            expr = re.sub(r'math\.sin\((.*?)\)', r'math.sin(\1 * math.pi / 180)', expr)
-            expr = re.sub(r'math\.cos\((.*?)\)', r'math.cos(\1 * math.pi / 180)', expr)
-            expr = re.sub(r'math\.tan\((.*?)\)', r'math.tan(\1 * math.pi / 180)', expr)
-            
-            # For inverse trig functions, convert the result from radians to degrees
-            expr = re.sub(r'math\.asin\((.*?)\)', r'(math.asin(\1) * 180 / math.pi)', expr)
-            expr = re.sub(r'math\.acos\((.*?)\)', r'(math.acos(\1) * 180 / math.pi)', expr)
-            expr = re.sub(r'math\.atan\((.*?)\)', r'(math.atan(\1) * 180 / math.pi)', expr)        
-        elif angle_mode == "grd":
-            # Convert gradians to radians for trig functions
-            expr = re.sub(r'math\.sin\((.*?)\)', r'math.sin(\1 * math.pi / 200)', expr)
-            expr = re.sub(r'math\.cos\((.*?)\)', r'math.cos(\1 * math.pi / 200)', expr)
-            expr = re.sub(r'math\.tan\((.*?)\)', r'math.tan(\1 * math.pi / 200)', expr)
-            
-            # For inverse trig functions, convert the result from radians to gradians
-            expr = re.sub(r'math\.asin\((.*?)\)', r'(math.asin(\1) * 200 / math.pi)', expr)
-            expr = re.sub(r'math\.acos\((.*?)\)', r'(math.acos(\1) * 200 / math.pi)', expr)
-            expr = re.sub(r'math\.atan\((.*?)\)', r'(math.atan(\1) * 200 / math.pi)', expr)
+    # Everything that depends on the angle mode is bound here rather than in the generated code
+    eval_namespace.update(build_trig_functions(angle_mode, hyp))
+    eval_namespace.update({
+        "dms_to_decimal": partial(dms_to_decimal, angle_mode=angle_mode),
+        "rad_to_angle_mode": partial(rad_to_angle_mode, angle_mode=angle_mode),
+        "grad_to_angle_mode": partial(grad_to_angle_mode, angle_mode=angle_mode)
+    })
+    
+    eval_namespace.update({name: prime_function(name) for name in ("prime_pi", "nth_prime", "next_prime")})
     
-    return expr
+    eval_namespace.update({
+        "rectangular_to_polar_r": rectangular_to_polar_r,
+        "rectangular_to_polar_theta": partial(rectangular_to_polar_theta, angle_mode=angle_mode),
+        "polar_to_rectangular_x": partial(polar_to_rectangular_x, angle_mode=angle_mode),
+        "polar_to_rectangular_y": partial(polar_to_rectangular_y, angle_mode=angle_mode)
+    })
+    
+    return eval_namespace
+
+def prime_function(name):
+    # The prime sieve needs NumPy and a cache file, so it's only loaded once one of these is used
+    def call(x):
+        from . import primes
+        return getattr(primes, name)(x)
+    return call
+
+def power(base, exponent):
+    # Exact integer powers are sized before computing them, so 9^9^9 fails fast instead of hanging
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        if exponent * math.log2(abs(base)) > MAX_RESULT_BITS:
+            raise OverflowError("Power too large to compute")
+    return base ** exponent
+
+# Half a turn in each non-radian angle mode
+HALF_TURNS = {"deg": 180, "grd": 200}
+
+def build_trig_functions(angle_mode: str = "rad", hyp: bool = False, lib=math) -> dict:
+    """sin..atan for an angle mode, taking arguments and returning inverses in that mode.
+
+    `lib` supplies the underlying functions (math, or an array equivalent).
+    """
+    if hyp:
+        # Hyperbolic functions take no angle conversion
+        return {name: getattr(lib, name + "h") for name in TRIG_FUNCTIONS}
+    if angle_mode not in HALF_TURNS:
+        return {name: getattr(lib, name) for name in TRIG_FUNCTIONS}
+    
+    half_turn = HALF_TURNS[angle_mode]
+    functions = {}
+    for name in TRIG_FUNCTIONS:
+        if name.startswith("a"):
+            functions[name] = _angle_result(getattr(lib, name), lib.pi, half_turn)
+        else:
+            functions[name] = _angle_argument(getattr(lib, name), lib.pi, half_turn)
+    return functions
+
+def _angle_argument(function, pi, half_turn):
+    return lambda x: function(x * pi / half_turn)
+
+def _angle_result(function, pi, half_turn):
+    return lambda x: function(x) * half_turn / pi
+
+# Batches smaller than this are evaluated in-process; process start-up isn't worth it
+PARALLEL_THRESHOLD = 5000
+
+def evaluate_many(expressions, parallel_threshold: int = PARALLEL_THRESHOLD,
+                  max_workers: int = None, chunk_size: int = None, **settings) -> list:
+    """Evaluate many expressions with the same settings, returning results in input order"""
+    expressions = list(expressions)
+    
+    if len(expressions) < parallel_threshold:
+        return _evaluate_chunk(expressions, settings)
+    
+    workers = max_workers or os.cpu_count() or 1
+    if chunk_size is None:
+        # A few chunks per worker keeps the pool busy without paying per-item IPC
+        chunk_size = max(1, math.ceil(len(expressions) / (workers * 4)))
+    chunks = [expressions[i:i + chunk_size] for i in range(0, len(expressions), chunk_size)]
+    
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_results in executor.map(_evaluate_chunk, chunks, repeat(settings)):
+            results.extend(chunk_results)
+    return results
+
+def _evaluate_chunk(expressions, settings):
+    # Compiled code and the mode namespace are shared through their caches
+    return [evaluate_expression(expression, **settings) for expression in expressions]
+
+# Maximum number of compiled expressions kept around for repeated evaluation
+EXPRESSION_CACHE_SIZE = 256
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(expression: str):
+    """Parse and compile an expression, returning (code object, ParsedExpression).
+
+    The code doesn't depend on the angle mode, so one entry serves every mode.
+    """
+    parsed = parse(expression, variables=BOUND_NAMES)
+    source = ast_to_python(parsed.body)
+    return compile(source, "<expression>", "eval"), parsed
+
+def expression_cache_info() -> dict:
+    info = compile_expression.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
+
+def clear_expression_cache():
+    compile_expression.cache_clear()
 
 def clean_floating_point_errors(result):
     if isinstance(result, float):
@@ -293,222 +355,172 @@ def clean_floating_point_errors(result):
             return round(result)
     return result
 
-def process_expression(expression: str, angle_mode: str) -> str:    
-    # Replace calculator symbols with Python equivalents
-    expr = expression.replace("÷", "/").replace("π", "math.pi").replace("^", "**")
-    
-    # Handle percentage (%) - simply replace with division by 100
-    expr = re.sub(r'(\d+(?:\.\d+)?)%', r'\1/100', expr)
-    
-    # Handle negation syntax (-)x
-    expr = re.sub(r'\(-\)(\s*\d+|\s*\(|\s*[a-zA-Z])', r'-\1', expr)
-    
-    # Handle DMS notation (5°5'5")
-    dms_pattern = r'(\d+)°(\d+)\'(\d+)"'
-    expr = re.sub(dms_pattern, r'dms_to_decimal(\1, \2, \3, "{0}")'.format(angle_mode), expr)
-    
-    # Handle radian symbol (5r)
-    rad_pattern = r'(\d+(?:\.\d+)?)r'
-    expr = re.sub(rad_pattern, r'rad_to_angle_mode(\1, "{0}")'.format(angle_mode), expr)
-    
-    # Handle gradian symbol (5g)
-    grad_pattern = r'(\d+(?:\.\d+)?)g'
-    expr = re.sub(grad_pattern, r'grad_to_angle_mode(\1, "{0}")'.format(angle_mode), expr)
-    
-    # Handle coordinate conversion functions
-    expr = re.sub(r'R►Pr\((.+?),(.+?)\)', r'rectangular_to_polar_r(\1, \2)', expr)
-    expr = re.sub(r'R►Pθ\((.+?),(.+?)\)', r'rectangular_to_polar_theta(\1, \2, "{0}")'.format(angle_mode), expr)
-    expr = re.sub(r'P►Rx\((.+?),(.+?)\)', r'polar_to_rectangular_x(\1, \2, "{0}")'.format(angle_mode), expr)
-    expr = re.sub(r'P►Ry\((.+?),(.+?)\)', r'polar_to_rectangular_y(\1, \2, "{0}")'.format(angle_mode), expr)
-        
-    # Handle nth root (X√) with a number prefix
-    nth_root_pattern = r'(\d+)X√\('  # Match only integers before X√
-    i = 0
-    while i < len(expr):
-        match = re.search(nth_root_pattern, expr[i:])
-        if not match:
-            break
-            
-        # Adjust match positions to account for offset
-        start_pos = i + match.start()
-        end_pos = i + match.end()
-        
-        # Get the root value (n) - extract as string first
-        n_str = match.group(1)
-        
-        # Convert to numeric value carefully
-        n = int(n_str)  # Use simple integer conversion
-        
-        # Find the matching closing parenthesis
-        open_count = 1
-        close_pos = None
-        
-        for j in range(end_pos, len(expr)):
-            if expr[j] == '(':
-                open_count += 1
-            elif expr[j] == ')':
-                open_count -= 1
-                if open_count == 0:
-                    close_pos = j
-                    break
-                            
-        if close_pos is None:
-            # No closing parenthesis found, process the rest of the string
-            arg_expr = expr[end_pos:]
-            
-            # Create the power expression using math.pow with 1.0 for floating-point division
-            new_expr = f"math.pow({arg_expr}, 1.0/{n})"
-            
-            expr = expr[:start_pos] + new_expr
-            i = len(expr)  # Move to end of string
-        else:
-            # Found closing parenthesis
-            arg_expr = expr[end_pos:close_pos]
-            
-            # Create the power expression using math.pow with 1.0 for floating-point division
-            new_expr = f"math.pow({arg_expr}, 1.0/{n})"
-            
-            expr = expr[:start_pos] + new_expr + expr[close_pos+1:]
-            i = start_pos + len(new_expr)  # Continue search after replacement
-    
-    # NOW handle X√ without a preceding number (treat as square root)
-    expr = expr.replace("X√(", "math.sqrt(")
-    
-    # FINALLY handle the simple square root symbol (√)
-    expr = re.sub(r'√\(', 'math.sqrt(', expr)
-    
-    # Handle Euler's number 'e' - replace standalone 'e' with math.e
-    # Use regex to avoid replacing 'e' in function names or other identifiers
-    expr = re.sub(r'(?<![a-zA-Z])e(?![a-zA-Z])', 'math.e', expr)
-    
-    # Handle inverse trig functions with regex for more precision
-    # This specifically looks for the pattern sin**(-1) followed by opening parenthesis
-    expr = re.sub(r'sin\s*\*\*\s*\(\s*-\s*1\s*\)\s*\(', r'math.asin(', expr)
-    expr = re.sub(r'cos\s*\*\*\s*\(\s*-\s*1\s*\)\s*\(', r'math.acos(', expr)
-    expr = re.sub(r'tan\s*\*\*\s*\(\s*-\s*1\s*\)\s*\(', r'math.atan(', expr)
-    
-    # Also handle the compact form without spaces
-    expr = re.sub(r'sin\*\*\(-1\)\(', r'math.asin(', expr)
-    expr = re.sub(r'cos\*\*\(-1\)\(', r'math.acos(', expr)
-    expr = re.sub(r'tan\*\*\(-1\)\(', r'math.atan(', expr)
-    
-    # Handle calculator-specific functions
-    function_mappings = {
-        'sin': 'math.sin',
-        'cos': 'math.cos',
-        'tan': 'math.tan',
-        'log': 'math.log10',
-        'ln': 'math.log',
-        'asin': 'math.asin',
-        'acos': 'math.acos',
-        'atan': 'math.atan',
-        'e^': 'math.e**'
-    }
-    
-    # Process each function
-    for func_name, math_func in function_mappings.items():
-        expr = replace_function(expr, func_name, math_func, angle_mode)
-    
-    # Basic safety check
-    if any(keyword in expr for keyword in ["import", "exec", "eval", "__"]):
-        raise ValueError("Invalid expression: potentially unsafe operations")
-    
-    # One final check for any weird combinations that might have emerged
-    expr = expr.replace("math.amath.", "math.a")
-    expr = expr.replace("math.math.", "math.")
-    
-    # Handle factorial
-    expr = re.sub(r'(\d+)!', r'factorial(\1)', expr)
-    
-    # Handle permutation and combination
-    expr = re.sub(r'(\d+|[a-zA-Z][a-zA-Z0-9]*)\s*nPr\s*(\d+|[a-zA-Z][a-zA-Z0-9]*)', r'permutation(\1, \2)', expr)
-    expr = re.sub(r'(\d+|[a-zA-Z][a-zA-Z0-9]*)\s*nCr\s*(\d+|[a-zA-Z][a-zA-Z0-9]*)', r'combination(\1, \2)', expr)
-    
-    expr = re.sub(r'\brand\b(?!\()', r'rand()', expr)
-    
-    return expr
+# Extra significant digits carried when rounding integers from their leading bits
+GUARD_DIGITS = 20
 
-def replace_function(expression: str, func_name: str, replacement: str, angle_mode: str) -> str:
-    result = expression
-    i = 0
-    
-    while i < len(result):
-        # Find function name
-        func_pos = result.find(func_name + "(", i)
-        if func_pos == -1:
-            break
-        
-        # Find the opening parenthesis position
-        open_paren_pos = func_pos + len(func_name)
-        
-        # Find matching closing parenthesis (accounting for nesting)
-        paren_count = 1
-        close_paren_pos = None
-        
-        for j in range(open_paren_pos + 1, len(result)):
-            if result[j] == '(':
-                paren_count += 1
-            elif result[j] == ')':
-                paren_count -= 1
-                if paren_count == 0:
-                    close_paren_pos = j
-                    break
-        
-        # Extract function arguments
-        if close_paren_pos is not None:
-            # We found a matching closing parenthesis
-            args = result[open_paren_pos + 1:close_paren_pos]
-            
-            # Process arguments recursively
-            processed_args = process_expression(args, angle_mode)
-            
-            # Fix any double math prefixes
-            processed_args = processed_args.replace("math.math.", "math.")
-            
-            # Create Python function call
-            python_func = f"{replacement}({processed_args})"
-            
-            # Replace in the original expression
-            result = result[:func_pos] + python_func + result[close_paren_pos + 1:]
-            
-            # Update search position
-            i = func_pos + len(python_func)
+def integer_significant_digits(value: int, digits: int):
+    """Round |value| to `digits` significant digits, returning (digit string, decimal exponent).
+
+    Huge integers are rounded from their leading bits with bounded-precision decimal
+    arithmetic, so this never converts the whole number to decimal.
+    """
+    value = abs(value)
+    rounding = decimal.Context(prec=digits, rounding=decimal.ROUND_HALF_EVEN,
+                               Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+    
+    if value.bit_length() <= 256:
+        # Small enough to round exactly
+        rounded = rounding.plus(decimal.Decimal(value))
+    else:
+        # value lies in [top, top + 1) * 2^shift, with top holding ~4 bits per digit kept
+        shift = value.bit_length() - 4 * (digits + GUARD_DIGITS)
+        top = value >> shift
+        working = decimal.Context(prec=digits + GUARD_DIGITS + 10, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+        approx = working.multiply(decimal.Decimal(top), working.power(decimal.Decimal(2), shift))
+        
+        # Both ends of the error interval must round the same way for the answer to be certain
+        # (all arithmetic stays in the local contexts; the ambient one is only 28 digits)
+        error = decimal.Decimal(1).scaleb(-(digits + GUARD_DIGITS))
+        low = rounding.plus(working.multiply(approx, working.subtract(1, error)))
+        high = rounding.plus(working.multiply(approx, working.add(1, error)))
+        if low == high:
+            rounded = low
         else:
-            # No matching closing parenthesis
-            args = result[open_paren_pos + 1:]
-            
-            # Process arguments recursively
-            processed_args = process_expression(args, angle_mode)
-            
-            # Fix any double math prefixes
-            processed_args = processed_args.replace("math.math.", "math.")
-            
-            # Create Python function call with closing parenthesis
-            python_func = f"{replacement}({processed_args})"
-            
-            # Replace in the original expression
-            result = result[:func_pos] + python_func
-            
-            # Update search position
-            i = len(result)
+            rounded = _round_integer_exactly(value, digits, approx.adjusted())
     
-    return result
+    sign, digit_tuple, _ = rounded.as_tuple()
+    digit_string = "".join(map(str, digit_tuple)).ljust(digits, "0")[:digits]
+    return digit_string, rounded.adjusted()
 
-def balance_parentheses(expr: str) -> str:
-    open_count = 0
-    
-    # Count how many unclosed parentheses we have
-    for char in expr:
-        if char == '(':
-            open_count += 1
-        elif char == ')':
-            open_count -= 1
-    
-    # If we have unclosed parentheses, add the necessary closing ones
-    if open_count > 0:
-        expr += ')' * open_count
-        
-    return expr
+def _round_integer_exactly(value: int, digits: int, exponent: int) -> decimal.Decimal:
+    # Only reached when value sits on (or within ~1e-20 of) a rounding boundary
+    if value < 10 ** exponent:
+        exponent -= 1
+    elif value >= 10 ** (exponent + 1):
+        exponent += 1
+    drop = exponent + 1 - digits
+    quotient, remainder = divmod(value, 10 ** drop)
+    half = 5 * 10 ** (drop - 1)
+    if remainder > half or (remainder == half and quotient % 2 == 1):
+        quotient += 1
+    return decimal.Decimal(quotient).scaleb(drop)
+
+def format_integer_scientific(value: int, decimal_places: int = None, engineering: bool = False) -> str:
+    """Format an integer as mantissa x10^exponent (6 significant digits, or FIX decimals)"""
+    sign = "-" if value < 0 else ""
+    
+    if not engineering:
+        digits = 6 if decimal_places is None else decimal_places + 1
+        mantissa_digits, exponent = integer_significant_digits(value, digits)
+        lead = 1
+    elif decimal_places is None:
+        mantissa_digits, exponent = integer_significant_digits(value, 6)
+        lead = exponent - 3 * (exponent // 3) + 1
+    else:
+        # FIX counts places after the point, and an eng mantissa has 1-3 digits before it
+        _, exponent = integer_significant_digits(value, 17)
+        lead = exponent - 3 * (exponent // 3) + 1
+        mantissa_digits, rounded_exponent = integer_significant_digits(value, decimal_places + lead)
+        if rounded_exponent != exponent:
+            # Rounding carried into the next power of ten, which may start a new group
+            exponent = rounded_exponent
+            lead = exponent - 3 * (exponent // 3) + 1
+            mantissa_digits = "1" + "0" * (decimal_places + lead - 1)
+    
+    whole, fraction = mantissa_digits[:lead], mantissa_digits[lead:]
+    if decimal_places is None:
+        fraction = fraction.rstrip("0")
+    mantissa = f"{whole}.{fraction}" if fraction else whole
+    return f"{sign}{mantissa}x10^{exponent - lead + 1}"
+
+TRIG_FUNCTIONS = ("sin", "cos", "tan", "asin", "acos", "atan")
+
+SIMPLE_FUNCTIONS = {
+    "log": "math.log10",
+    "ln": "math.log",
+    "sqrt": "math.sqrt",
+    "abs": "abs",
+    "rand": "rand",
+    "randi": "randi",
+    "r_to_p_r": "rectangular_to_polar_r",
+    "prime_pi": "prime_pi",
+    "nth_prime": "nth_prime",
+    "next_prime": "next_prime",
+}
+
+ANGLE_FUNCTIONS = {
+    "r_to_p_theta": "rectangular_to_polar_theta",
+    "p_to_r_x": "polar_to_rectangular_x",
+    "p_to_r_y": "polar_to_rectangular_y",
+}
+
+def ast_to_python(node: tuple) -> str:
+    """Translate a parser AST into a Python expression for the eval namespace"""
+    kind = node[0]
+    
+    if kind == "num":
+        return repr(node[1])
+    if kind == "const":
+        return f"math.{node[1]}"
+    if kind == "var":
+        return node[1]
+    
+    if kind == "unary":
+        return f"({node[1]}{ast_to_python(node[2])})"
+    
+    if kind == "binary":
+        op = node[1]
+        left = ast_to_python(node[2])
+        right = ast_to_python(node[3])
+        if op == "^":
+            return f"power({left}, {right})"
+        if op == "X√":
+            # The left operand is the root index, e.g. 3X√(27)
+            return f"math.pow({right}, 1.0/{left})"
+        if op == "nPr":
+            return f"permutation({left}, {right})"
+        if op == "nCr":
+            return f"combination({left}, {right})"
+        return f"({left} {op} {right})"
+    
+    if kind == "postfix":
+        op = node[1]
+        operand = ast_to_python(node[2])
+        if op == "!":
+            return f"factorial({operand})"
+        if op == "%":
+            return f"({operand} / 100)"
+        if op == "E":
+            # Dividing keeps negative powers of ten exact, e.g. 5E(-)5
+            exponent = node[3]
+            return f"({operand} * 1e{exponent})" if exponent >= 0 else f"({operand} / 1e{-exponent})"
+        if op == "r":
+            return f"rad_to_angle_mode({operand})"
+        return f"grad_to_angle_mode({operand})"
+    
+    if kind == "dms":
+        degrees, minutes, seconds = (ast_to_python(part) for part in node[1:])
+        return f"dms_to_decimal({degrees}, {minutes}, {seconds})"
+    
+    if kind == "mixed":
+        whole, numerator, denominator = (ast_to_python(part) for part in node[1:])
+        return f"({whole} + {numerator} / {denominator})"
+    
+    # Function calls
+    func = node[1]
+    args = [ast_to_python(arg) for arg in node[2]]
+    joined = ", ".join(args)
+    
+    if func in TRIG_FUNCTIONS:
+        if len(args) != 1:
+            raise ValueError(f"{func} takes exactly one argument")
+        # Bound per angle mode and hyp setting in the namespace
+        return f"{func}({joined})"
+    
+    if func in ANGLE_FUNCTIONS:
+        return f"{ANGLE_FUNCTIONS[func]}({joined})"
+    
+    return f"{SIMPLE_FUNCTIONS[func]}({joined})"
 
 def decimal_to_mixed_fraction(num):
     if num == int(num):  # If it's a whole number
@@ -548,34 +560,6 @@ def decimal_to_mixed_fraction(num):
         'raw_value': num
     }
     
-def parse_mixed_fractions(expression: str) -> str:
-    # Use regex to find all mixed fractions in the expression
-    import re
-    
-    # First, normalize division symbols to ensure consistent processing
-    expression = expression.replace("÷", "/")
-    
-    # Pattern to match mixed fractions: whole number, ┘ symbol, numerator/denominator
-    pattern = r'(-?\d+)┘(\d+)/(\d+)'
-    
-    def replace_mixed_fraction(match):
-        whole = int(match.group(1))
-        numerator = int(match.group(2))
-        denominator = int(match.group(3))
-        
-        # Calculate the decimal value
-        if whole < 0:
-            # For negative whole numbers, we need to subtract the fraction part
-            decimal_value = whole - (numerator / denominator)
-        else:
-            # For positive whole numbers, we add the fraction part
-            decimal_value = whole + (numerator / denominator)
-        
-        return str(decimal_value)
-    
-    # Replace all mixed fractions with their decimal equivalents
-    return re.sub(pattern, replace_mixed_fraction, expression)
-
 def mixed_to_improper_fraction(num):
     if num == int(num):  # If it's a whole number
         result_str = f"{int(num)}/1"
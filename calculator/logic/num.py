@@ -1,7 +1,800 @@
+from array import array
 from dataclasses import dataclass, field
+from functools import lru_cache
 import math
 from typing import Dict, List, Tuple, Optional, Any
 
+# Trial divisors tried before any strong test; a survivor below 53² is prime
+SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47)
+
+# Miller-Rabin with the first 13 prime bases is deterministic below this bound
+MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+MILLER_RABIN_LIMIT = 3317044064679887385961981
+
+def is_prime(n):
+    """Deterministic Miller-Rabin below 3.3·10²⁴, Baillie-PSW above (no known counterexample)"""
+    if n < 2:
+        return False
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    if n < 53 * 53:
+        return True
+    if n < MILLER_RABIN_LIMIT:
+        return all(is_strong_probable_prime(n, base) for base in MILLER_RABIN_BASES)
+    return is_strong_probable_prime(n, 2) and is_strong_lucas_probable_prime(n)
+
+def is_strong_probable_prime(n, base):
+    # Miller-Rabin round for odd n: write n - 1 = d·2^s with d odd
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    x = pow(base, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+def is_strong_lucas_probable_prime(n):
+    # Strong Lucas test for odd n with Selfridge's parameters: the first D in
+    # 5, -7, 9, -11, ... with (D/n) = -1, P = 1, Q = (1 - D)/4
+    if math.isqrt(n) ** 2 == n:
+        return False  # No suitable D exists for squares
+    D = 5
+    while True:
+        j = jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P, Q = 1, (1 - D) // 4
+    
+    # n + 1 = d·2^s with d odd
+    d, s = n + 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    
+    def half(x):
+        # x/2 mod n (n is odd)
+        x %= n
+        return (x + n if x & 1 else x) // 2
+    
+    # Walk the bits of d, keeping U_k, V_k and Q^k
+    U, V, Qk = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        U, V = U * V % n, (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == "1":
+            U, V = half(P * U + V), half(D * U + P * V)
+            Qk = Qk * Q % n
+    
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if V == 0:
+            return True
+    return False
+
+def jacobi(a, n):
+    """Jacobi symbol (a/n) for odd n > 0"""
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+# Operands up to this many bits use plain Euclid; Lehmer's algorithm runs on
+# leading words of this size
+LEHMER_BITS = 64
+
+# Operands above this many bits go through the recursive half-gcd reduction
+HALF_GCD_BITS = 1 << 13
+
+def extended_gcd(a, b):
+    """(g, x, y) with a·x + b·y = g = gcd(a, b) ≥ 0, without recursion"""
+    sign_a, sign_b = (-1 if a < 0 else 1), (-1 if b < 0 else 1)
+    a, b = abs(a), abs(b)
+    swapped = a < b
+    if swapped:
+        a, b = b, a
+    if b.bit_length() <= LEHMER_BITS:
+        g, x = _euclid_cofactor(a, b)
+    elif b.bit_length() <= HALF_GCD_BITS:
+        g, x = _lehmer_cofactor(a, b)
+    else:
+        A, B, _, _, g, _ = _reduce(a, b, 0)
+        x = A
+    y = (g - a * x) // b if b else 0
+    if swapped:
+        x, y = y, x
+    return g, sign_a * x, sign_b * y
+
+def _euclid_cofactor(a, b):
+    # gcd(a, b) and x with a·x ≡ gcd (mod b), tracking only a's cofactor
+    x0, x1 = 1, 0
+    while b:
+        q, r = divmod(a, b)
+        a, b = b, r
+        x0, x1 = x1, x0 - q * x1
+    return a, x0
+
+def _lehmer_cofactor(a, b):
+    # Lehmer: run Euclid on the leading words, then apply the whole batch of
+    # quotients to the full numbers with one 2x2 multiplication
+    x0, x1 = 1, 0
+    while b.bit_length() > LEHMER_BITS:
+        A, B, C, D = _lehmer_matrix(a, b)
+        if B == 0:
+            # The leading words couldn't agree on a quotient; take one full step
+            q, r = divmod(a, b)
+            a, b = b, r
+            x0, x1 = x1, x0 - q * x1
+        else:
+            a, b = A * a + B * b, C * a + D * b
+            x0, x1 = A * x0 + B * x1, C * x0 + D * x1
+    g, x = _euclid_cofactor(a, b)
+    # Fold the last stretch (a, b) = (x0·a₀ + ..., x1·a₀ + ...) back in
+    return g, x * x0 + ((g - a * x) // b if b else 0) * x1
+
+def _lehmer_matrix(a, b):
+    # Knuth's Algorithm L on the top LEHMER_BITS of a and b: the matrix of every
+    # quotient both bounds of the leading words agree on
+    shift = a.bit_length() - LEHMER_BITS
+    ah, bh = a >> shift, b >> shift
+    A, B, C, D = 1, 0, 0, 1
+    while bh + C and bh + D:
+        q = (ah + A) // (bh + C)
+        if q != (ah + B) // (bh + D):
+            break
+        A, C = C, A - q * C
+        B, D = D, B - q * D
+        ah, bh = bh, ah - q * bh
+    return A, B, C, D
+
+def _reduce(a, b, bits):
+    """Reduce a ≥ b ≥ 0 until b < 2^bits (b == 0 for bits = 0).
+
+    Returns (A, B, C, D, a', b') with a' = A·a + B·b and b' = C·a + D·b. This is
+    the half-gcd recursion: the matrix for the next few bits comes from the top
+    of a and b, worked out recursively at half the size. Each step is checked
+    and corrected, since quotients from truncated operands can overshoot.
+    """
+    A, B, C, D = 1, 0, 0, 1
+    while b >> bits:
+        excess = b.bit_length() - bits
+        if excess <= HALF_GCD_BITS // 4 or b.bit_length() <= HALF_GCD_BITS:
+            # Small enough: Lehmer steps on the full numbers
+            M = _lehmer_matrix(a, b) if b.bit_length() > LEHMER_BITS else (1, 0, 0, 1)
+        else:
+            # Reduce the top 2k bits by k bits, recursively, and apply that to (a, b)
+            k = excess // 2
+            shift = max(a.bit_length() - 2 * k, 0)
+            M = _reduce(a >> shift, b >> shift, k)[:4]
+        P, Q, R, S = M
+        new_a, new_b = P * a + Q * b, R * a + S * b
+        if new_a < 0:
+            new_a, P, Q = -new_a, -P, -Q
+        if new_b < 0:
+            new_b, R, S = -new_b, -R, -S
+        if new_a < new_b:
+            new_a, new_b, P, Q, R, S = new_b, new_a, R, S, P, Q
+        if M == (1, 0, 0, 1) or Q == 0 or new_a >= a:
+            # No usable batch; one ordinary division step
+            q, r = divmod(a, b)
+            new_a, new_b, P, Q, R, S = b, r, 0, 1, 1, -q
+        a, b = new_a, new_b
+        A, B, C, D = P * A + Q * C, P * B + Q * D, R * A + S * C, R * B + S * D
+    return A, B, C, D, a, b
+
+def bezout_coefficients(a, b):
+    """(x, y) with a·x + b·y = gcd(a, b) for a, b > 0, choosing the pair with the smallest |x| + |y|"""
+    g, x, y = extended_gcd(a, b)
+    step_x, step_y = b // g, a // g
+    # Every solution is (x - k·b/g, y + k·a/g); start from the k that centres x
+    k = (2 * x + step_x) // (2 * step_x)
+    candidates = [(x - j * step_x, y + j * step_y) for j in (k - 1, k, k + 1)]
+    return min(candidates, key=lambda pair: (abs(pair[0]) + abs(pair[1]), abs(pair[0])))
+
+def primes_below(limit):
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b"\x00\x00"
+    for i in range(2, math.isqrt(limit - 1) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return [i for i in range(limit) if sieve[i]]
+
+# Factors below this are found by trial division before anything cleverer is tried
+TRIAL_DIVISION_LIMIT = 1 << 16
+TRIAL_PRIMES = primes_below(TRIAL_DIVISION_LIMIT)
+
+def factorize(n):
+    """Prime factorization of n ≥ 1 as {prime: exponent}, smallest prime first.
+
+    Trial division by the table above, then a perfect-power check and Brent's
+    variant of Pollard rho on what's left, recursing on composite pieces.
+    """
+    factors = {}
+    for p in TRIAL_PRIMES:
+        if p * p > n:
+            break
+        if n % p == 0:
+            exponent = 0
+            while n % p == 0:
+                n //= p
+                exponent += 1
+            factors[p] = exponent
+    if n > 1:
+        if n < TRIAL_DIVISION_LIMIT ** 2:
+            # Every factor below the limit is gone, so what's left must be prime
+            factors[n] = factors.get(n, 0) + 1
+        else:
+            _factor_large(n, 1, factors)
+    return dict(sorted(factors.items()))
+
+# Number of factorizations kept around, so stepping n with a fixed m (or re-entering
+# NUM with the same values) doesn't factor anything twice
+FACTORIZATION_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=FACTORIZATION_CACHE_SIZE)
+def cached_factorization(n):
+    """factorize(n) as a tuple of (prime, exponent) pairs, shared by every calculation"""
+    return tuple(factorize(n).items())
+
+def factorization_cache_info() -> dict:
+    info = cached_factorization.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
+
+def clear_factorization_cache():
+    cached_factorization.cache_clear()
+
+def totient(n):
+    """Euler's φ(n), in exact integers"""
+    result = n
+    for prime, _ in cached_factorization(n):
+        result = result // prime * (prime - 1)
+    return result
+
+def carmichael_lambda(n):
+    """Carmichael function λ(n): the exponent of the unit group mod n"""
+    result = 1
+    for prime, exponent in cached_factorization(n):
+        if prime == 2 and exponent >= 3:
+            value = 2 ** (exponent - 2)
+        else:
+            value = (prime - 1) * prime ** (exponent - 1)
+        result = result * value // math.gcd(result, value)
+    return result
+
+def is_knodel(n, k=1):
+    """Whether a^(n-k) ≡ 1 (mod n) for every a coprime to n, for 0 < k < n.
+
+    That holds exactly when λ(n) | n - k, which for k = 1 is Korselt's criterion
+    (n squarefree with p - 1 | n - 1 for each p | n), so primes pass too.
+    """
+    if not 0 < k < n:
+        raise ValueError("k must be between 0 and n")
+    return (n - k) % carmichael_lambda(n) == 0
+
+def multiplicative_order(n, m):
+    """Smallest k > 0 with n^k ≡ 1 (mod m), for n coprime to m.
+
+    Starts from λ(m), which every order divides, and strips each prime factor
+    of it for as long as the power stays at 1.
+    """
+    n %= m
+    order = carmichael_lambda(m)
+    for prime, _ in cached_factorization(order):
+        while order % prime == 0 and pow(n, order // prime, m) == 1:
+            order //= prime
+    return order
+
+def has_primitive_root(m):
+    # The unit group mod m is cyclic only for m = 1, 2, 4, p^k and 2p^k with p an odd prime
+    if m in (1, 2, 4):
+        return True
+    odd = m // 2 if m % 4 == 2 else m
+    factors = cached_factorization(odd)
+    return len(factors) == 1 and factors[0][0] != 2
+
+def is_primitive_root(n, m):
+    """Whether n generates the units mod m, i.e. n^(φ/q) ≢ 1 for every prime q | φ(m)"""
+    if math.gcd(n, m) != 1 or not has_primitive_root(m):
+        return False
+    phi = totient(m)
+    return all(pow(n, phi // prime, m) != 1 for prime, _ in cached_factorization(phi))
+
+def primitive_root(m):
+    """Smallest generator of the units mod m, or None when they aren't cyclic"""
+    if not has_primitive_root(m):
+        return None
+    if m <= 2:
+        return m - 1
+    phi = totient(m)
+    exponents = [phi // prime for prime, _ in cached_factorization(phi)]
+    for g in range(2, m):
+        if math.gcd(g, m) == 1 and all(pow(g, e, m) != 1 for e in exponents):
+            return g
+
+def iter_generators(m):
+    """Every generator mod m, as g^k for k coprime to φ(m) in increasing k"""
+    g = primitive_root(m)
+    if g is None:
+        return
+    phi = totient(m)
+    power = 1 % m
+    for k in range(1, phi + 1):
+        power = power * g % m
+        if math.gcd(k, phi) == 1:
+            yield power
+
+def generator_array(m):
+    # The generators packed as unsigned 64-bit ints, in the order iter_generators gives them
+    if m > 1 << 64:
+        raise ValueError("Generator arrays hold moduli below 2^64")
+    return array("Q", iter_generators(m))
+
+def fibonacci_pair(k, m):
+    """(F(k), F(k+1)) mod m by fast doubling"""
+    a, b = 0, 1
+    for bit in bin(k)[2:]:
+        # F(2j) = F(j)·(2F(j+1) - F(j)), F(2j+1) = F(j)² + F(j+1)²
+        a, b = a * (2 * b - a) % m, (a * a + b * b) % m
+        if bit == "1":
+            a, b = b, (a + b) % m
+    return a, b
+
+def pisano_period(m):
+    """Period of the Fibonacci sequence mod m, as the lcm of π(p^k) over m's prime powers.
+
+    π(p^k) divides p^(k-1)·π(p), and π(p) divides p - 1 when p ≡ ±1 (mod 5) and
+    2(p + 1) otherwise (π(2) = 3, π(5) = 20), so each one is found by stripping
+    prime factors from that bound while F stays at (0, 1).
+    """
+    period = 1
+    for prime, exponent in cached_factorization(m):
+        if prime == 2:
+            bound = 3
+        elif prime == 5:
+            bound = 20
+        elif prime % 5 in (1, 4):
+            bound = prime - 1
+        else:
+            bound = 2 * (prime + 1)
+        modulus = prime ** exponent
+        candidate = bound * prime ** (exponent - 1)
+        factors = dict(cached_factorization(bound))
+        factors[prime] = factors.get(prime, 0) + exponent - 1
+        for q in factors:
+            while candidate % q == 0 and fibonacci_pair(candidate // q, modulus) == (0, 1 % modulus):
+                candidate //= q
+        period = period * candidate // math.gcd(period, candidate)
+    return period
+
+# Largest baby-step table a discrete log may build; prime-order subgroups too
+# big for it are searched with Pollard rho instead
+DISCRETE_LOG_TABLE_SIZE = 1 << 16
+
+# Rho walks that meet without fixing the log are restarted at most this many times
+RHO_RESTARTS = 16
+
+def discrete_log(a, n, m):
+    """Smallest x ≥ 0 with n^x ≡ a (mod m), or None if there is none.
+
+    Common factors of n and m are divided out first (each one accounts for
+    a step of x), then the coprime problem is solved by Pohlig-Hellman over
+    the factored order of n.
+    """
+    a %= m
+    n %= m
+    target, base, modulus = a, n, m
+    
+    # Peel off gcd(n, m) until n is a unit; the coefficient collects n/g
+    offset, coefficient = 0, 1 % m
+    while True:
+        g = math.gcd(n, m)
+        if g == 1:
+            break
+        if a == coefficient:
+            return offset
+        if a % g:
+            return None
+        a //= g
+        m //= g
+        coefficient = coefficient * (n // g) % m
+        offset += 1
+    if m == 1:
+        return offset
+    n %= m
+    a = a * pow(coefficient, -1, m) % m
+    
+    order = multiplicative_order(n, m)
+    if pow(a, order, m) != 1:
+        return None  # a isn't a power of n
+    
+    # Pohlig-Hellman: solve mod each q^e || order, one base-q digit at a time
+    n_inverse = pow(n, -1, m)
+    x, solved = 0, 1
+    for prime, exponent in cached_factorization(order):
+        gamma = pow(n, order // prime, m)  # order q
+        digits = 0
+        for i in range(exponent):
+            h = pow(a * pow(n_inverse, digits, m), order // prime ** (i + 1), m)
+            digit = _prime_order_log(gamma, h, prime, m)
+            if digit is None:
+                return None
+            digits += digit * prime ** i
+        # Combine with the moduli solved so far (they're coprime)
+        prime_power = prime ** exponent
+        x += solved * ((digits - x) * pow(solved, -1, prime_power) % prime_power)
+        solved *= prime_power
+    x += offset
+    return x if pow(base, x, modulus) == target else None
+
+def _prime_order_log(g, h, q, m):
+    # log_g(h) mod m where g has prime order q
+    if h == 1:
+        return 0
+    if pow(h, q, m) != 1:
+        return None
+    if math.isqrt(q - 1) + 1 <= DISCRETE_LOG_TABLE_SIZE:
+        return _log_baby_giant(g, h, q, m)
+    # Rho only finishes if h is in <g>, which a non-cyclic group doesn't promise.
+    # Mod a prime power p^e with g ≢ 1 the order-q elements form one cyclic
+    # group (q is odd here), so solve there and check the answer mod m
+    for prime, exponent in cached_factorization(m):
+        prime_power = prime ** exponent
+        if g % prime_power != 1:
+            log = _log_rho(g % prime_power, h % prime_power, q, prime_power)
+            return log if log is not None and pow(g, log, m) == h else None
+    return None
+
+def _log_baby_giant(g, h, q, m):
+    size = math.isqrt(q - 1) + 1
+    baby_steps = {}
+    value = 1
+    for j in range(size):
+        baby_steps.setdefault(value, j)
+        value = value * g % m
+    giant = pow(g, -size, m)
+    value = h
+    for i in range(size):
+        if value in baby_steps:
+            return i * size + baby_steps[value]
+        value = value * giant % m
+    return None
+
+def _log_rho(g, h, q, m):
+    # Pollard rho with Floyd cycle finding: walk x = g^u·h^v until two walks meet,
+    # then g^(u-U) = h^(V-v) gives the log unless V ≡ v
+    def step(x, u, v):
+        if x % 3 == 0:
+            return x * x % m, 2 * u % q, 2 * v % q
+        if x % 3 == 1:
+            return x * g % m, (u + 1) % q, v
+        return x * h % m, u, (v + 1) % q
+    
+    for start in range(1, min(q, RHO_RESTARTS + 1)):
+        x, u, v = pow(g, start, m) * h % m, start, 1
+        X, U, V = x, u, v
+        while True:
+            x, u, v = step(x, u, v)
+            X, U, V = step(*step(X, U, V))
+            if x == X:
+                break
+        if (V - v) % q:
+            log = (u - U) * pow(V - v, -1, q) % q
+            if pow(g, log, m) == h:
+                return log
+        # The walks met without fixing the log; start somewhere else
+    return None
+
+def _factor_large(n, multiplicity, factors):
+    # n has no prime factors below TRIAL_DIVISION_LIMIT
+    if is_prime(n):
+        factors[n] = factors.get(n, 0) + multiplicity
+        return
+    root, power = perfect_power(n)
+    if power > 1:
+        _factor_large(root, multiplicity * power, factors)
+        return
+    divisor = pollard_brent(n)
+    _factor_large(divisor, multiplicity, factors)
+    _factor_large(n // divisor, multiplicity, factors)
+
+def integer_root(n, k):
+    """Largest x with x**k <= n"""
+    if n < 2:
+        return n
+    x = 1 << -(-n.bit_length() // k)
+    while True:
+        y = ((k - 1) * x + n // x ** (k - 1)) // k
+        if y >= x:
+            return x
+        x = y
+
+def perfect_power(n):
+    # (root, k) with root**k == n and k as large as possible; k == 1 if n isn't a power.
+    # Only used after trial division, so the root exceeds TRIAL_DIVISION_LIMIT and k stays small
+    max_power = n.bit_length() // (TRIAL_DIVISION_LIMIT.bit_length() - 1)
+    for k in TRIAL_PRIMES:
+        if k > max_power:
+            break
+        root = integer_root(n, k)
+        if root ** k == n:
+            inner_root, inner_power = perfect_power(root)
+            return inner_root, k * inner_power
+    return n, 1
+
+def pollard_brent(n):
+    """A nontrivial factor of the odd composite n, using Brent's cycle detection
+    with the gcds batched over runs of steps"""
+    batch = 128
+    for c in range(1, n):
+        y, r, q, g = 2, 1, 1, 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                saved_y = y
+                for _ in range(min(batch, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += batch
+            r *= 2
+        if g == n:
+            # The batch swallowed every factor at once; replay it one step at a time
+            g = 1
+            while g == 1:
+                saved_y = (saved_y * saved_y + c) % n
+                g = math.gcd(abs(x - saved_y), n)
+        if g != n:
+            return g
+        # x² + c cycled without splitting n; try the next constant
+    raise ValueError(f"Could not factor {n}")
+
+def is_square_mod_prime_power(a, p, k):
+    """Whether x² ≡ a (mod p^k) has a solution, from the symbol of a's unit part"""
+    a %= p ** k
+    if a == 0:
+        return True
+    v = 0
+    while a % p == 0:
+        a //= p
+        v += 1
+    if v % 2:
+        return False
+    # a = p^v·u with u a unit mod p^r, r = k - v
+    r = k - v
+    if p == 2:
+        return r == 1 or (r == 2 and a % 4 == 1) or a % 8 == 1
+    return jacobi(a, p) == 1
+
+def square_count_prime_power(p, k):
+    # Squares mod p^k, zero included: 0 plus p^v·(unit square mod p^(k-v)) for each even v < k
+    count = 1
+    for v in range(0, k, 2):
+        r = k - v
+        if p == 2:
+            count += 1 if r <= 2 else 2 ** (r - 3)
+        else:
+            count += (p - 1) * p ** (r - 1) // 2
+    return count
+
+def chinese_remainder(congruences):
+    """(x, M) with x ≡ r (mod n) for every (r, n) pair and M their lcm, or None if
+    the congruences contradict each other; the moduli needn't be coprime"""
+    x, modulus = 0, 1
+    for residue, n in congruences:
+        g = math.gcd(modulus, n)
+        if (residue - x) % g:
+            return None
+        # x + modulus·t ≡ residue (mod n), solved for t mod n/g
+        t = (residue - x) // g * pow(modulus // g, -1, n // g) % (n // g)
+        x += modulus * t
+        modulus = modulus // g * n
+        x %= modulus
+    return x, modulus
+
+def sqrt_mod_prime(a, p):
+    """A root of x² ≡ a (mod p) for prime p by Tonelli-Shanks, or None"""
+    a %= p
+    if a == 0 or p == 2:
+        return a
+    if jacobi(a, p) != 1:
+        return None
+    if p % 4 == 3:
+        return pow(a, (p + 1) // 4, p)
+    # p - 1 = q·2^s with q odd, and z any non-residue
+    q, s = p - 1, 0
+    while q % 2 == 0:
+        q //= 2
+        s += 1
+    z = 2
+    while jacobi(z, p) != -1:
+        z += 1
+    c, t, root = pow(z, q, p), pow(a, q, p), pow(a, (q + 1) // 2, p)
+    while t != 1:
+        # Least i with t^(2^i) = 1
+        i, t2 = 0, t
+        while t2 != 1:
+            t2 = t2 * t2 % p
+            i += 1
+        b = pow(c, 1 << (s - i - 1), p)
+        s, c = i, b * b % p
+        t, root = t * c % p, root * b % p
+    return root
+
+def _unit_square_roots(u, p, k):
+    # Every root of x² ≡ u (mod p^k) for a unit u, in increasing order
+    modulus = p ** k
+    if p == 2:
+        if k == 1:
+            return [1]
+        if u % (4 if k == 2 else 8) != 1:
+            return []
+        if k == 2:
+            return [1, 3]
+        # Lift a root of x² ≡ u one power of 2 at a time
+        x = 1
+        for j in range(3, k):
+            if (x * x - u) % (1 << (j + 1)):
+                x += 1 << (j - 1)
+        half = modulus // 2
+        return sorted({x, modulus - x, (x + half) % modulus, (half - x) % modulus})
+    root = sqrt_mod_prime(u, p)
+    if root is None:
+        return []
+    # Hensel lifting, doubling the exponent each Newton step
+    lifted = p
+    while lifted < modulus:
+        lifted = min(lifted * lifted, modulus)
+        root = (root - (root * root - u) * pow(2 * root, -1, lifted)) % lifted
+    return sorted({root, modulus - root})
+
+def _split_power(a, p, k):
+    # (v, u) with a = p^v·u mod p^k and u a unit; a ≢ 0
+    v = 0
+    while a % p == 0:
+        a //= p
+        v += 1
+    return v, a
+
+def sqrt_mod_prime_power(a, p, k):
+    """Every root of x² ≡ a (mod p^k), in increasing order"""
+    modulus = p ** k
+    a %= modulus
+    if a == 0:
+        return list(range(0, modulus, p ** ((k + 1) // 2)))
+    v, u = _split_power(a, p, k)
+    if v % 2:
+        return []
+    # x = p^(v/2)·y with y² ≡ u (mod p^(k-v)); y is free mod p^(k-v/2)
+    half, rest = v // 2, p ** (k - v)
+    return sorted(p ** half * (y + t * rest) for y in _unit_square_roots(u, p, k - v) for t in range(p ** half))
+
+def square_root_count(a, m):
+    """How many x mod m have x² ≡ a, without listing them"""
+    count = 1
+    for p, k in cached_factorization(m):
+        a_k = a % p ** k
+        if a_k == 0:
+            count *= p ** (k // 2)
+            continue
+        v, u = _split_power(a_k, p, k)
+        if v % 2:
+            return 0
+        count *= len(_unit_square_roots(u, p, k - v)) * p ** (v // 2)
+    return count
+
+def square_roots(a, m):
+    """Every root of x² ≡ a (mod m), in increasing order: roots mod each prime
+    power of m, combined by the CRT"""
+    roots = [0]
+    modulus = 1
+    for p, k in cached_factorization(m):
+        prime_power = p ** k
+        roots = [chinese_remainder([(x, modulus), (y, prime_power)])[0]
+                 for x in roots for y in sqrt_mod_prime_power(a, p, k)]
+        modulus *= prime_power
+    return sorted(roots)
+
+# Moduli up to this get their residues marked in a bitset; above it pages are
+# found by testing each candidate
+QR_BITSET_LIMIT = 1 << 26
+
+# Residues per page when iterating
+QR_PAGE_SIZE = 256
+
+class QuadraticResidues:
+    """The set {x² mod m}, without listing it.
+
+    The size comes from the prime-power counts multiplied over m's factorization
+    (CRT), and membership from the symbol test on each prime power, so neither
+    depends on the size of m. Residues are listed a page at a time.
+    """
+
+    def __init__(self, m):
+        self.m = m
+        self.factors = cached_factorization(m)
+        self.count = 1
+        for p, k in self.factors:
+            self.count *= square_count_prime_power(p, k)
+        self._bits = None
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, a):
+        return all(is_square_mod_prime_power(a, p, k) for p, k in self.factors)
+
+    def __iter__(self):
+        start = 0
+        while True:
+            page = self.page(start)
+            yield from page
+            if len(page) < QR_PAGE_SIZE:
+                return
+            start = page[-1] + 1
+
+    def bitset(self):
+        """Packed bits, least significant first, with bit r set when r is a residue"""
+        if self.m > QR_BITSET_LIMIT:
+            raise ValueError(f"QR bitsets are only built for m ≤ {QR_BITSET_LIMIT}")
+        if self._bits is None:
+            import numpy as np
+            marks = np.zeros(self.m, dtype=bool)
+            block = 1 << 20
+            # (m - x)² ≡ x², so x ≤ m/2 is enough
+            for low in range(0, self.m // 2 + 1, block):
+                x = np.arange(low, min(low + block, self.m // 2 + 1), dtype=np.int64)
+                marks[x * x % self.m] = True
+            self._bits = np.packbits(marks, bitorder="little")
+        return self._bits
+
+    def page(self, start=0, size=QR_PAGE_SIZE):
+        """Up to size residues r ≥ start, in increasing order"""
+        residues = []
+        if self.m <= QR_BITSET_LIMIT:
+            import numpy as np
+            bits = self.bitset()
+            byte = start // 8
+            while len(residues) < size and byte < len(bits):
+                chunk = np.unpackbits(bits[byte:byte + 4096], bitorder="little")
+                found = np.flatnonzero(chunk) + 8 * byte
+                residues.extend(int(r) for r in found[(found >= start) & (found < self.m)])
+                byte += 4096
+            return residues[:size]
+        r = start
+        while len(residues) < size and r < self.m:
+            if r in self:
+                residues.append(r)
+            r += 1
+        return residues
+
+    def last(self):
+        r = self.m - 1
+        while r not in self:
+            r -= 1
+        return r
+
 @dataclass
 class NumberTheoryResults:
     # Single value results (n-dependent)
@@ -23,7 +816,7 @@ class NumberTheoryResults:
     is_generator: Optional[bool] = None               # Gen(n mod m)
     
     # m-dependent results
-    quadratic_residues: Optional[List[int]] = None    # QR(m)
+    quadratic_residues: Optional['QuadraticResidues'] = None  # QR(m)
     
     # a,n,m-dependent results
     legendre_symbol: Optional[int] = None             # (a/p)
@@ -33,7 +826,62 @@ class NumberTheoryResults:
     # Special functions
     pisano_period: Optional[int] = None               # Period of Fibonacci mod m
     knodel_check: Optional[bool] = None               # Knödel check
+    knodel_k: Optional[int] = None                    # k the Knödel check used
     cubic_classes: Optional[int] = None               # CubCls(m)
+    square_roots: Optional[List[int]] = None          # x with x² ≡ n mod m, when few enough to list
+    square_root_count: Optional[int] = None           # How many such x there are
+    primitive_root: Optional[int] = None              # PRoot(m), smallest generator mod m
+
+# Which calculate_* method fills each result field. A field is only calculated
+# when asked for, and again once one of the inputs its method reads changes
+RESULT_SOURCES = {
+    'factorization': 'calculate_n_dependent',
+    'divisor_count': 'calculate_n_dependent',
+    'divisor_sum': 'calculate_n_dependent',
+    'mobius': 'calculate_n_dependent',
+    'radical': 'calculate_n_dependent',
+    'totient': 'calculate_n_dependent',
+    'carmichael': 'calculate_n_dependent',
+    'is_prime': 'calculate_n_dependent',
+    'gcd': 'calculate_nm_dependent',
+    'lcm': 'calculate_nm_dependent',
+    'bezout': 'calculate_nm_dependent',
+    'modular_inverse': 'calculate_nm_dependent',
+    'order': 'calculate_order',
+    'is_generator': 'calculate_order',
+    'quadratic_residues': 'calculate_quadratic_residues',
+    'legendre_symbol': 'calculate_symbols',
+    'jacobi_symbol': 'calculate_symbols',
+    'discrete_log': 'calculate_anm_dependent',
+    'pisano_period': 'calculate_pisano_period',
+    'knodel_check': 'calculate_knodel_check',
+    'knodel_k': 'calculate_knodel_check',
+    'cubic_classes': 'calculate_cubic_class_count',
+    'square_roots': 'calculate_square_roots',
+    'square_root_count': 'calculate_square_roots',
+    'primitive_root': 'calculate_primitive_root',
+}
+
+# The inputs each of those methods reads
+CALCULATION_INPUTS = {
+    'calculate_n_dependent': ('n',),
+    'calculate_nm_dependent': ('n', 'm'),
+    'calculate_order': ('n', 'm'),
+    'calculate_quadratic_residues': ('m',),
+    'calculate_symbols': ('n', 'm'),
+    'calculate_anm_dependent': ('a', 'n', 'm'),
+    'calculate_pisano_period': ('m',),
+    'calculate_knodel_check': ('a', 'n'),
+    'calculate_cubic_class_count': ('m',),
+    'calculate_square_roots': ('n', 'm'),
+    'calculate_primitive_root': ('m',),
+}
+
+# Square roots mod m are only listed up to this many
+SQUARE_ROOT_LIMIT = 1 << 12
+
+def result_fields(method):
+    return [name for name, source in RESULT_SOURCES.items() if source == method]
 
 class NumberTheoryManager:
     def __init__(self):
@@ -44,10 +892,11 @@ class NumberTheoryManager:
         self.current_field = "n"
         self.current_value = ""
         
-        self.results = NumberTheoryResults()
+        self.reset_results()
         
     def reset_results(self):
         self.results = NumberTheoryResults()
+        self.calculated = {}  # calculate_* method -> the inputs it last ran with
     
     def start_data_entry(self, default_mod=None):
         self.in_data_entry = True
@@ -208,39 +1057,49 @@ class NumberTheoryManager:
         self.reset_results()
     
     def calculate_all(self):
-        # Clear previous results
-        self.reset_results()
-        
-        # Skip if n is not set
-        if self.n_value is None:
-            return
-        
-        # Calculate n-dependent functions
-        self.calculate_n_dependent()
-        
-        # If m is set, calculate n,m-dependent and m-dependent functions
-        if self.m_value is not None:
-            self.calculate_m_dependent()
-            self.calculate_nm_dependent()
-            
-        # If a is set, calculate a,n,m-dependent functions
-        if self.a_value is not None and self.m_value is not None:
-            self.calculate_anm_dependent()
+        for name in RESULT_SOURCES:
+            self.result(name)
+    
+    def inputs(self):
+        return self.n_value, self.m_value, self.a_value
+    
+    def calculation_key(self, method):
+        # The values of the inputs a calculate_* method reads
+        return tuple(getattr(self, f"{field}_value") for field in CALCULATION_INPUTS[method])
+    
+    def is_calculated(self, name):
+        method = RESULT_SOURCES[name]
+        return self.calculated.get(method) == self.calculation_key(method)
+    
+    def result(self, name):
+        """The named NumberTheoryResults field, calculated on first use for the current inputs"""
+        method = RESULT_SOURCES[name]
+        key = self.calculation_key(method)
+        if self.calculated.get(method) != key:
+            # Clear whatever the method filled for the old inputs, since it may return early
+            self.store_results(method, key, {})
+            getattr(self, method)()
+        return getattr(self.results, name)
+    
+    def method_results(self, method):
+        return {name: getattr(self.results, name) for name in result_fields(method)}
+    
+    def store_results(self, method, key, values):
+        # Fill a method's fields for the inputs in key, e.g. from a background job (see num_jobs)
+        for name in result_fields(method):
+            setattr(self.results, name, values.get(name))
+        self.calculated[method] = key
     
     # Helper methods for calculations
     def is_prime(self, num):
-        if num <= 1:
-            return False
-        if num <= 3:
-            return True
-        if num % 2 == 0 or num % 3 == 0:
-            return False
-        i = 5
-        while i * i <= num:
-            if num % i == 0 or num % (i + 2) == 0:
-                return False
-            i += 6
-        return True  
+        return is_prime(num)
+    
+    def prime_powers(self, num):
+        # {prime: exponent}, through the shared factorization cache
+        return dict(cached_factorization(num))
+    
+    def totient(self, num):
+        return totient(num)
     
     def calculate_n_dependent(self):
         n = self.n_value
@@ -259,33 +1118,20 @@ class NumberTheoryManager:
             self.results.carmichael = 1
             return
         
+        # Calculate primality of n
+        self.results.is_prime = is_prime(n)
+        
         # Calculate prime factorization (Fac)
+        prime_powers = self.prime_powers(n)  # Prime factors and their exponents
         factors = []
-        prime_powers = {}  # Store prime factors and their exponents
-        i = 2
-        num = n
-        while i * i <= num:
-            if num % i:
-                i += 1
+        for prime, count in prime_powers.items():
+            if count > 1:
+                superscript = str(count).translate(str.maketrans('0123456789', '⁰¹²³⁴⁵⁶⁷⁸⁹'))
+                factors.append(f"{prime}{superscript}")
             else:
-                count = 0
-                while num % i == 0:
-                    num //= i
-                    count += 1
-                prime_powers[i] = count
-                if count > 1:
-                    superscript = str(count).translate(str.maketrans('0123456789', '⁰¹²³⁴⁵⁶⁷⁸⁹'))
-                    factors.append(f"{i}{superscript}")
-                else:
-                    factors.append(f"{i}")
-        if num > 1:
-            prime_powers[num] = 1
-            factors.append(f"{num}")        
+                factors.append(f"{prime}")
         self.results.factorization = " · ".join(factors)
         
-        # Calculate primality of n
-        self.results.is_prime = (len(factors) == 1 and all(c.isdigit() for c in factors[0]))
-        
         # Calculate divisor count τ(n) = (e₁+1)(e₂+1)...(eₖ+1) where eᵢ are the exponents in the prime factorization
         divisor_count = 1
         for exponent in prime_powers.values():
@@ -312,75 +1158,40 @@ class NumberTheoryManager:
         for prime in prime_powers.keys():
             self.results.radical *= prime
             
-        # Calculate totient φ(n) = n × (1 - 1/p₁) × (1 - 1/p₂) × ... × (1 - 1/pₖ)
-        totient = n
-        for prime in prime_powers.keys():
-            totient *= (prime - 1) / prime
-        self.results.totient = int(totient)
+        # Calculate totient φ(n) = n × (1 - 1/p₁) × (1 - 1/p₂) × ... × (1 - 1/pₖ), in exact integers
+        self.results.totient = self.totient(n)
         
         # Calculate Carmichael function λ(n)
-        def lcm(a, b):
-            return a * b // math.gcd(a, b)
-        carmichael_values = []
-        for prime, exponent in prime_powers.items():
-            if prime == 2 and exponent >= 3:
-                carmichael_values.append(2**(exponent-2))
-            elif prime == 2 and exponent == 2:
-                carmichael_values.append(2)
-            elif prime == 2 and exponent == 1:
-                carmichael_values.append(1)
-            else:
-                carmichael_values.append((prime - 1) * prime**(exponent - 1))
-        result = 1
-        for val in carmichael_values:
-            result = lcm(result, val)
-        self.results.carmichael = result
+        self.results.carmichael = carmichael_lambda(n)
+    
+    def calculate_knodel_check(self):
+        n = self.n_value
+        if n is None or n <= 1:
+            return
         
-        # Calculate Knödel check
-        if self.results.is_prime:
-            self.results.knodel_check = True
+        # Knödel-a when a is set, otherwise the Carmichael (k = 1) case; an a
+        # outside 0 < a < n leaves the check empty rather than quietly using k = 1
+        k = 1 if self.a_value is None else self.a_value
+        if not 0 < k < n:
             return
-        for a in range(2, n):
-            if math.gcd(a, n) == 1:
-                if pow(a, (n - 1), n) != 1:
-                    self.results.knodel_check = False
-                    return
-        self.results.knodel_check = True
-    
-    def calculate_m_dependent(self):
+        self.results.knodel_k = k
+        self.results.knodel_check = is_knodel(n, k)
+    
+    def calculate_quadratic_residues(self):
         m = self.m_value
         if m is None or m <= 1:
             return
         
-        # Calculate quadratic residues q mod m (QR) where q ≡ x² (mod m) for some x
-        qr_set = set()
-        for x in range(m):
-            residue = (x * x) % m
-            qr_set.add(residue)
-        qr_list = sorted(qr_set)
-        self.results.quadratic_residues = qr_list
-        
-        # Calculate Pisano period for Fibonacci mod m
-        if m <= 0:
-            self.results.pisano_period = None
-            return
-        if m == 1:
-            self.results.pisano_period = 1
+        # Quadratic residues q mod m (QR) where q ≡ x² (mod m) for some x, kept as a set to query
+        self.results.quadratic_residues = QuadraticResidues(m)
+    
+    def calculate_pisano_period(self):
+        m = self.m_value
+        if m is None or m <= 1:
             return
-        a, b = 0, 1
-        period = 0
-        while True:
-            period += 1
-            a, b = b, (a + b) % m
-            if a == 0 and b == 1:
-                break
-            if period > m * m:
-                self.results.pisano_period = None
-                return
-        self.results.pisano_period = period
         
-        # Calculate cubic classes (CubCls) for m -- it's complex enough to break it out into its own function
-        self.results.cubic_classes = self.calculate_cubic_classes(m)
+        # Calculate Pisano period for Fibonacci mod m
+        self.results.pisano_period = pisano_period(m)
     
     def calculate_nm_dependent(self):
         n = self.n_value
@@ -389,26 +1200,12 @@ class NumberTheoryManager:
         if n is None or m is None or n <= 0 or m <= 1:
             return
             
-        # Calculate GCD(n, m)
-        self.results.gcd = math.gcd(n, m)
+        # Calculate GCD(n, m) and the Bezout coefficients x, y with nx + my = gcd(n,m), in one pass
+        x, y = bezout_coefficients(n, m)
+        self.results.gcd = n * x + m * y
         
         # Calculate LCM(n, m)
-        self.results.lcm = (n * m) // self.results.gcd
-        
-        # Calculate Bezout coefficients - Find x, y where nx + my = gcd(n,m) using Extended Euclidean Algorithm
-        def extended_gcd(a, b):
-            if a == 0:
-                return b, 0, 1
-            else:
-                g, x, y = extended_gcd(b % a, a)
-                return g, y - (b // a) * x, x        
-        gcd, x, y = extended_gcd(n, m)
-        if x != 0:
-            k = round(x * gcd / m)
-            new_x = x - k * (m // gcd)
-            new_y = y + k * (n // gcd)
-            if abs(new_x) + abs(new_y) < abs(x) + abs(y):
-                x, y = new_x, new_y        
+        self.results.lcm = n // self.results.gcd * m
         self.results.bezout = (x, y)
         
         # Calculate modular inverse of n mod m - only exists if gcd(n, m) = 1
@@ -419,81 +1216,71 @@ class NumberTheoryManager:
         else:
             self.results.modular_inverse = None
             
-        if self.results.gcd == 1:
-            # Calculate order of n in the multiplicative group mod m
-            order = 1
-            value = n % m
-            while value != 1:
-                value = (value * n) % m
-                order += 1
-                if order > m:
-                    self.results.order = None
-                    break
-            else:
-                self.results.order = order
-            
-            # Calculate if n is a generator
-            phi_m = m
-            i = 2
-            temp_m = m
-            while i * i <= temp_m:
-                if temp_m % i == 0:
-                    phi_m = phi_m // i * (i - 1)
-                    while temp_m % i == 0:
-                        temp_m //= i
-                i += 1
-            if temp_m > 1:
-                phi_m = phi_m // temp_m * (temp_m - 1)
-            if self.results.order is not None:
-                self.results.is_generator = (self.results.order == phi_m)
-            else:
-                self.results.is_generator = False
+    def calculate_order(self):
+        n = self.n_value
+        m = self.m_value
+        if n is None or m is None or n <= 0 or m <= 1:
+            return
+        
+        if math.gcd(n, m) == 1:
+            # Calculate order of n in the multiplicative group mod m, and whether n generates it
+            self.results.order = multiplicative_order(n, m)
+            self.results.is_generator = is_primitive_root(n, m)
         else:
             self.results.order = None
             self.results.is_generator = False
-            
-        # Calculate Legendre Symbol (n/m)              
+    
+    def calculate_symbols(self):
+        n = self.n_value
+        m = self.m_value
+        if n is None or m is None or n <= 0 or m <= 1:
+            return
+        
+        # Calculate Legendre Symbol (n/m), defined for prime m
         if not self.is_prime(m):
             self.results.legendre_symbol = None
-            return
-        if n % m == 0:
+        elif n % m == 0:
             self.results.legendre_symbol = 0
-            return
-        exponent = (m - 1) // 2
-        result = pow(n, exponent, m)
-        if result == m - 1:
-            self.results.legendre_symbol = -1
         else:
-            self.results.legendre_symbol = result
-            
-        # Calculate Jacobi Symbol (a/n)
+            exponent = (m - 1) // 2
+            result = pow(n, exponent, m)
+            if result == m - 1:
+                self.results.legendre_symbol = -1
+            else:
+                self.results.legendre_symbol = result
+        
+        # Calculate Jacobi Symbol (n/m), defined for odd m
         if m % 2 == 0 or m < 3:
             self.results.jacobi_symbol = None
+        else:
+            self.results.jacobi_symbol = jacobi(n, m)
+    
+    def calculate_square_roots(self):
+        n = self.n_value
+        m = self.m_value
+        if n is None or m is None or m <= 1:
             return
-        def jacobi(n, m):
-            n = n % m
-            if n == 0:
-                return 0 if m > 1 else 1
-            if n == 1:
-                return 1
-            e = 0
-            n1 = n
-            while n1 % 2 == 0:
-                e += 1
-                n1 //= 2
-            if e % 2 == 0:
-                s = 1
-            else:
-                if m % 8 in [1, 7]:
-                    s = 1
-                else:
-                    s = -1
-            if n1 == 1:
-                return s
-            if m % 4 == 3 and n1 % 4 == 3:
-                s = -s
-            return s * jacobi(m % n1, n1)
-        self.results.jacobi_symbol = jacobi(n, m)        
+        
+        # Solutions of x² ≡ n (mod m), built from the roots mod each prime power of m
+        self.results.square_root_count = square_root_count(n, m)
+        if self.results.square_root_count <= SQUARE_ROOT_LIMIT:
+            self.results.square_roots = square_roots(n, m)
+    
+    def calculate_primitive_root(self):
+        m = self.m_value
+        if m is None or m <= 1:
+            return
+        
+        # Smallest g whose order is φ(m), if (ℤ/mℤ)* is cyclic at all
+        self.results.primitive_root = primitive_root(m)
+    
+    def generators(self, m):
+        # All generators mod m, for building tables or picking DLog bases
+        return generator_array(m)
+    
+    def chinese_remainder(self, congruences):
+        # x ≡ r (mod n) for each (r, n), as (x, lcm of the moduli) or None
+        return chinese_remainder(congruences)
     
     def calculate_anm_dependent(self):
         a = self.a_value
@@ -503,59 +1290,15 @@ class NumberTheoryManager:
         if a is None or n is None or m is None:
             return
             
-        # Ensure values are within proper ranges
-        a = a % m
-        n = n % m
-        
-        # Special cases
-        if a == 0:
-            self.results.discrete_log = 0 if n == 0 else None
-            return
-        if n == 0:
-            self.results.discrete_log = None
-            return
-        if n == 1:
-            self.results.discrete_log = 0 if a == 1 else None
-            return
-            
-        # We need gcd(n,m) = 1 for discrete log to be well-defined
-        if math.gcd(n, m) != 1:
-            # If gcd(n,m) > 1 but it doesn't divide a, no solution exists
-            if a % math.gcd(n, m) != 0:
-                self.results.discrete_log = None
-                return
-            # Otherwise, it's a more complex case - we'll return None for simplicity
-            self.results.discrete_log = None
+        self.results.discrete_log = discrete_log(a, n, m)
+    
+    def calculate_cubic_class_count(self):
+        m = self.m_value
+        if m is None or m <= 1:
             return
         
-        # Implement Baby-step Giant-step algorithm
-        
-        # Compute N = ceiling(sqrt(m))
-        N = int(math.ceil(math.sqrt(m)))
-        
-        # Baby steps: Compute a·n^j mod m for j = 0,1,2,...,N-1
-        baby_steps = {}
-        for j in range(N):
-            # Calculate a * n^j mod m
-            value = (a * pow(n, j, m)) % m
-            baby_steps[value] = j        
-        # Compute n^(-N) mod m using modular multiplicative inverse. Since gcd(n,m) = 1, we can use FLT if m is prime, or extended Euclidean algorithm otherwise
-        n_inv = pow(n, m - 2, m) if self.is_prime(m) else pow(n, -1, m)
-        c = pow(n_inv, N, m)
-        
-        # Giant steps: Compute n^(-N·i) mod m for i = 0,1,2,...,N
-        value = 1
-        for i in range(N + 1):
-            # Check if this giant step matches any baby step
-            if value in baby_steps:
-                # If we find n^(-N·i) ≡ a·n^j (mod m), then x = N·i + j
-                self.results.discrete_log = (i * N + baby_steps[value]) % m
-                return
-            # Update for next iteration: value = value * c % m
-            value = (value * c) % m
-        
-        # If we get here, no solution was found
-        self.results.discrete_log = None
+        # Calculate cubic classes (CubCls) for m -- it's complex enough to break it out into its own function
+        self.results.cubic_classes = self.calculate_cubic_classes(m)
     
     def calculate_cubic_classes(self, m):
         # For m=1, there's only one class (the zero form)
@@ -563,19 +1306,7 @@ class NumberTheoryManager:
             return 1
         
         # Prime factorization of m
-        factors = {}
-        temp_m = m
-        i = 2
-        while i * i <= temp_m:
-            if temp_m % i == 0:
-                count = 0
-                while temp_m % i == 0:
-                    temp_m //= i
-                    count += 1
-                factors[i] = count
-            i += 1
-        if temp_m > 1:
-            factors[temp_m] = 1
+        factors = self.prime_powers(m)
         
         # Result will be product of cubic classes for each prime power
         result = 1
@@ -0,0 +1,73 @@
+import multiprocessing
+from .num import NumberTheoryManager, result_fields
+
+# Shown in place of a NUM result while its job is running
+PENDING = "…"
+
+def _worker_main(conn):
+    # Runs in the worker process: answer (method, (n, m, a)) messages until the pipe closes.
+    # The process outlives each job, so the factorization cache stays warm between them
+    manager = NumberTheoryManager()
+    while True:
+        try:
+            method, (n, m, a) = conn.recv()
+        except EOFError:
+            return
+        manager.n_value, manager.m_value, manager.a_value = n, m, a
+        try:
+            manager.result(result_fields(method)[0])
+            conn.send(("ok", manager.method_results(method)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+class NumberTheoryJobs:
+    """Runs NumberTheoryManager calculations in a worker process, one job at a time.
+
+    A job that's no longer wanted is cancelled by killing the worker; the next
+    submit starts a fresh one.
+    """
+
+    def __init__(self):
+        self.context = multiprocessing.get_context()
+        self.process = None
+        self.conn = None
+        self.job = None  # (method, (n, m, a)) while a job is running
+
+    def submit(self, method, inputs):
+        if self.job == (method, inputs):
+            return
+        self.cancel()
+        if self.process is None:
+            self.conn, child_conn = self.context.Pipe()
+            self.process = self.context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+            self.process.start()
+            child_conn.close()
+        self.conn.send((method, inputs))
+        self.job = (method, inputs)
+
+    def poll(self):
+        """(method, inputs, status, payload) once the running job has finished, else None"""
+        if self.job is None or not self.conn.poll():
+            return None
+        try:
+            status, payload = self.conn.recv()
+        except EOFError:
+            # The worker died mid-job
+            status, payload = "error", "Worker process exited"
+            self.stop()
+        method, inputs = self.job
+        self.job = None
+        return method, inputs, status, payload
+
+    def cancel(self):
+        if self.job is not None:
+            # The only way to stop a CPU-bound job is to kill its process
+            self.stop()
+            self.job = None
+
+    def stop(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+            self.process = self.conn = None
@@ -0,0 +1,110 @@
+import math
+from dataclasses import dataclass, fields
+import numpy as np
+
+# Fields of NumberTheoryResults that a table holds for every n, with the dtype each is stored as
+TABLE_FIELDS = {
+    'totient': np.uint64,
+    'mobius': np.int8,
+    'divisor_count': np.uint16,  # τ(n) ≤ 1344 below 2³²
+    'divisor_sum': np.uint64,
+    'radical': np.uint64,
+    'carmichael': np.uint64,
+}
+
+@dataclass
+class ArithmeticTable:
+    """φ, μ, τ, σ, rad and λ for every n in [start, stop), as arrays indexed by n - start"""
+    start: int
+    stop: int
+    totient: np.ndarray
+    mobius: np.ndarray
+    divisor_count: np.ndarray
+    divisor_sum: np.ndarray
+    radical: np.ndarray
+    carmichael: np.ndarray
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, n):
+        # {field: value} for a single n, like the matching NumberTheoryResults fields
+        if not self.start <= n < self.stop:
+            raise IndexError(f"{n} is outside [{self.start}, {self.stop})")
+        return {name: int(getattr(self, name)[n - self.start]) for name in TABLE_FIELDS}
+
+    def save(self, path):
+        np.savez_compressed(path, start=self.start, stop=self.stop,
+                            **{name: getattr(self, name) for name in TABLE_FIELDS})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(**{f.name: data[f.name] if f.name in TABLE_FIELDS else int(data[f.name])
+                          for f in fields(cls)})
+
+def smallest_prime_factors(limit):
+    """spf[n] for 0 ≤ n ≤ limit (0 and 1 map to themselves)"""
+    spf = np.zeros(limit + 1, dtype=np.int64)
+    for p in range(2, math.isqrt(limit) + 1):
+        if spf[p] == 0:
+            block = spf[p * p::p]
+            block[block == 0] = p
+    unset = spf == 0
+    spf[unset] = np.arange(limit + 1)[unset]
+    return spf
+
+def arithmetic_table(stop, start=1):
+    """ArithmeticTable for [start, stop), from one smallest-prime-factor sieve.
+
+    Each n splits as p^e · rest with p = spf(n) and every prime of rest above p,
+    so a multiplicative function is the product of its values on the prime
+    powers met by following rest → rest[rest] → ... down to 1. That chain is at
+    most ω(n) ≤ 15 links long, so every field takes a handful of whole-array passes.
+    """
+    if not 1 <= start <= stop:
+        raise ValueError("Need 1 ≤ start ≤ stop")
+    limit = max(stop - 1, 1)
+    n = np.arange(limit + 1, dtype=np.int64)
+    p = smallest_prime_factors(limit)
+    p[:2] = 2  # Placeholders; 0 and 1 are set to 1 directly below
+
+    # Largest power of spf(n) dividing n, and its exponent
+    prime_power = p.copy()
+    exponent = np.ones(limit + 1, dtype=np.int64)
+    more = (n // prime_power) % p == 0
+    more[:2] = False
+    while more.any():
+        index = np.flatnonzero(more)
+        prime_power[index] *= p[index]
+        exponent[index] += 1
+        more[:] = False
+        more[index] = (n[index] // prime_power[index]) % p[index] == 0
+    rest = n // prime_power
+    rest[:2] = 1
+
+    # Each function on p^e
+    on_prime_power = {
+        'totient': prime_power - prime_power // p,
+        'mobius': np.where(exponent == 1, -1, 0),
+        'divisor_count': exponent + 1,
+        'divisor_sum': (prime_power * p - 1) // (p - 1),
+        'radical': p.copy(),
+        'carmichael': np.where((p == 2) & (exponent >= 3), prime_power // 4, prime_power - prime_power // p),
+    }
+
+    columns = {}
+    for name, values in on_prime_power.items():
+        values[:2] = 1
+        result = np.ones(limit + 1, dtype=np.int64)
+        current = n.copy()
+        current[:2] = 1
+        combine = np.lcm if name == 'carmichael' else np.multiply
+        while True:
+            active = np.flatnonzero(current > 1)
+            if active.size == 0:
+                break
+            result[active] = combine(result[active], values[current[active]])
+            current[active] = rest[current[active]]
+        columns[name] = result[start:stop].astype(TABLE_FIELDS[name])
+    return ArithmeticTable(start=start, stop=stop, **columns)
@@ -1,14 +1,19 @@
+from .num import RESULT_SOURCES
+from .num_jobs import PENDING
+
 class NumVarMenuManager:
-    def __init__(self):
+    def __init__(self, jobs=None):
         self.active = False
         self.cursor_pos = 0
         self.results = None
+        self.num_manager = None
+        self.jobs = jobs  # NumberTheoryJobs to calculate results off the GUI thread, if given
         
         # Define the full menu text with all number theory functions
-        self.menu_text = "Fac τ σ μ rad φ λ Prm GCD LCM Bzt Inv Ord Gen QR Leg Jac DLog Per Knd CbC"
+        self.menu_text = "Fac τ σ μ rad φ λ Prm GCD LCM Bzt Inv Ord Gen QR Leg Jac DLog Per Knd CbC Sqr PRt"
         
         # Define valid cursor positions for each function
-        self.valid_positions = [0, 4, 6, 8, 10, 14, 16, 18, 22, 26, 30, 34, 38, 42, 46, 49, 53, 57, 62, 66, 70]
+        self.valid_positions = [0, 4, 6, 8, 10, 14, 16, 18, 22, 26, 30, 34, 38, 42, 46, 49, 53, 57, 62, 66, 70, 74, 78]
         
         # Map functions to their display names for easier lookup
         self.function_map = {
@@ -32,13 +37,25 @@ class NumVarMenuManager:
             57: "DLog",   # Discrete logarithm
             62: "Per",    # Pisano period
             66: "Knd",    # Knödel check
-            70: "CbC"     # Cubic classes
+            70: "CbC",    # Cubic classes
+            74: "Sqr",    # Square roots mod m
+            78: "PRt"     # Smallest primitive root mod m
+        }
+        
+        # The NumberTheoryResults field behind each function
+        self.result_fields = {
+            0: "factorization", 4: "divisor_count", 6: "divisor_sum", 8: "mobius",
+            10: "radical", 14: "totient", 16: "carmichael", 18: "is_prime",
+            22: "gcd", 26: "lcm", 30: "bezout", 34: "modular_inverse",
+            38: "order", 42: "is_generator", 46: "quadratic_residues", 49: "legendre_symbol",
+            53: "jacobi_symbol", 57: "discrete_log", 62: "pisano_period", 66: "knodel_check",
+            70: "cubic_classes", 74: "square_roots", 78: "primitive_root"
         }
         
         # Keep track of functions requiring different inputs
         self.n_dependent = [0, 4, 6, 8, 10, 14, 16, 18]  # Fac through Prm
-        self.nm_dependent = [22, 26, 30, 34, 38, 42]    # GCD through Gen
-        self.m_dependent = [46, 62, 70]                 # QR, Per, CbC
+        self.nm_dependent = [22, 26, 30, 34, 38, 42, 74]  # GCD through Gen, Sqr
+        self.m_dependent = [46, 62, 70, 78]             # QR, Per, CbC, PRt
         self.anm_dependent = [49, 53, 57]               # Leg, Jac, DLog
         self.an_dependent = [66]                        # Knd
         
@@ -47,8 +64,7 @@ class NumVarMenuManager:
         self.cursor_pos = 0
         self.num_manager = num_manager
         
-        # Calculate all applicable number theory functions
-        num_manager.calculate_all()
+        # Results are calculated as the cursor reaches them, see get_current_value
         self.results = num_manager.results
         
         return self.menu_text, self.get_current_value()
@@ -69,7 +85,7 @@ class NumVarMenuManager:
         return self.menu_text, self.get_current_value()
     
     def get_current_value(self):
-        if not self.active or self.results is None:
+        if not self.active or self.num_manager is None:
             return None
             
         # Get function identifier from cursor position
@@ -77,67 +93,113 @@ class NumVarMenuManager:
         if pos not in self.function_map:
             return None
             
+        # With a job runner, anything not yet calculated is sent to it and shown as pending
+        if self.jobs is not None:
+            name = self.result_fields[pos]
+            if not self.num_manager.is_calculated(name):
+                self.jobs.submit(RESULT_SOURCES[name], self.num_manager.inputs())
+                return PENDING
+            # Moving onto a calculated entry cancels whatever was still running
+            self.jobs.cancel()
+            
         # Map cursor position to result value
         if pos == 0:  # Factorization
-            return self.results.factorization
+            return self.num_manager.result('factorization')
         elif pos == 4:  # Divisor count
-            return self.results.divisor_count
+            return self.num_manager.result('divisor_count')
         elif pos == 6:  # Divisor sum
-            return self.results.divisor_sum
+            return self.num_manager.result('divisor_sum')
         elif pos == 8:  # Möbius function
-            return self.results.mobius
+            return self.num_manager.result('mobius')
         elif pos == 10:  # Radical
-            return self.results.radical
+            return self.num_manager.result('radical')
         elif pos == 14:  # Totient
-            return self.results.totient
+            return self.num_manager.result('totient')
         elif pos == 16:  # Carmichael
-            return self.results.carmichael
+            return self.num_manager.result('carmichael')
         elif pos == 18:  # Primality
-            return "Prime" if self.results.is_prime else "Composite" if self.results.is_prime is not None else None
+            return "Prime" if self.num_manager.result('is_prime') else "Composite" if self.num_manager.result('is_prime') is not None else None
         elif pos == 22:  # GCD
-            return self.results.gcd
+            return self.num_manager.result('gcd')
         elif pos == 26:  # LCM
-            return self.results.lcm
+            return self.num_manager.result('lcm')
         if pos == 30:  # Bezout coefficients
-            if self.results.bezout:
-                x, y = self.results.bezout
+            if self.num_manager.result('bezout'):
+                x, y = self.num_manager.result('bezout')
                 n = self.num_manager.n_value
                 m = self.num_manager.m_value
-                gcd = self.results.gcd
+                gcd = self.num_manager.result('gcd')
                 
                 # Format as complete equation with coefficients clearly labeled
                 return f"{n}⋅({x}) + {m}⋅({y}) = {gcd}"
             return None
         elif pos == 34:  # Modular inverse
-            return self.results.modular_inverse
+            return self.num_manager.result('modular_inverse')
         elif pos == 38:  # Order
-            return self.results.order
+            return self.num_manager.result('order')
         elif pos == 42:  # Generator
-            return "Yes" if self.results.is_generator else "No" if self.results.is_generator is not None else None
+            return "Yes" if self.num_manager.result('is_generator') else "No" if self.num_manager.result('is_generator') is not None else None
         elif pos == 46:  # Quadratic residues
-            if self.results.quadratic_residues:
-                return f"{{{','.join(map(str, self.results.quadratic_residues))}}}"
-            return None
+            residues = self.num_manager.result('quadratic_residues')
+            if residues is None:
+                return None
+            # The count, then the first few and the last residue
+            if len(residues) <= 5:
+                shown = ','.join(map(str, residues))
+            else:
+                shown = ','.join(map(str, residues.page(0, 4))) + f",…,{residues.last()}"
+            return f"{len(residues)}: {{{shown}}}"
         elif pos == 49:  # Legendre symbol
-            return self.results.legendre_symbol
+            return self.num_manager.result('legendre_symbol')
         elif pos == 53:  # Jacobi symbol
-            return self.results.jacobi_symbol
+            return self.num_manager.result('jacobi_symbol')
         elif pos == 57:  # Discrete log
-            return self.results.discrete_log
+            return self.num_manager.result('discrete_log')
         elif pos == 62:  # Pisano period
-            return self.results.pisano_period
+            return self.num_manager.result('pisano_period')
         elif pos == 66:  # Knödel check
-            return "Yes" if self.results.knodel_check else "No" if self.results.knodel_check is not None else None
+            knodel = self.num_manager.result('knodel_check')
+            if knodel is None:
+                # a is the k being tested, so say so when it's out of range
+                return "Needs 0<a<n" if self.num_manager.a_value is not None else None
+            return f"{'Yes' if knodel else 'No'} (k={self.num_manager.result('knodel_k')})"
         elif pos == 70:  # Cubic classes
-            return self.results.cubic_classes
+            return self.num_manager.result('cubic_classes')
+        elif pos == 74:  # Square roots of n mod m
+            count = self.num_manager.result('square_root_count')
+            roots = self.num_manager.result('square_roots')
+            if count is None:
+                return None
+            if roots is None:
+                return f"{count} roots"
+            if count <= 5:
+                return f"{count}: {{{','.join(map(str, roots))}}}"
+            return f"{count}: {{{','.join(map(str, roots[:4]))},…,{roots[-1]}}}"
+        elif pos == 78:  # Primitive root
+            return self.num_manager.result('primitive_root')
         
         return None
         
     def deactivate(self):
         current_value = self.get_current_value()
         self.active = False
+        if self.jobs is not None:
+            self.jobs.cancel()
         return current_value
     
+    def poll(self):
+        """Store a finished job's results; True if the entry under the cursor should be redrawn"""
+        finished = self.jobs.poll() if self.jobs is not None else None
+        if finished is None:
+            return False
+        method, inputs, status, payload = finished
+        if inputs != self.num_manager.inputs():
+            return False  # n, m or a changed while it ran
+        # A failed job leaves its fields empty rather than retrying forever
+        values = payload if status == "ok" else {}
+        self.num_manager.store_results(method, self.num_manager.calculation_key(method), values)
+        return self.active
+    
     def check_dependencies_met(self):
         if not self.active:
             return False
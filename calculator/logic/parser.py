@@ -0,0 +1,281 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+# Each alternative is tried in order at the current position, so longer and more
+# specific spellings (►A B/C↔D/E, sin^(-1), (-)) must come before the generic ones
+_TOKEN_PATTERNS = [
+    ("ws", r"\s+"),
+    ("convert", r"►f↔d|>f<>d|►A B/C↔D/E|>A B/C<>D/E|►DMS"),
+    ("store", r"►(?:[a-e]|r)(?![A-Za-z])"),
+    ("func", r"(?:sin|cos|tan)\s*\^\s*\(\s*-\s*1\s*\)|R►Pr|R►Pθ|P►Rx|P►Ry"),
+    ("neg", r"\(-\)"),
+    ("number", r"(?:\d+\.?\d*|\.\d+)(?:E(?:[-+]|\(-\))?\d+)?"),
+    ("exponent", r"E(?:[-+]|\(-\))?\d+"),
+    ("op", r"X√|nPr|nCr|[-+*/÷^!%°'\"┘√(),]"),
+    # An uppercase letter starts a new name, so AnsX√( and AE2 split where the keys did
+    ("name", r"Ans|[A-Za-z][a-z]*|π"),
+]
+_TOKEN_RE = re.compile("|".join(f"(?P<{kind}>{pattern})" for kind, pattern in _TOKEN_PATTERNS))
+
+# Conversion operators and the name the evaluator knows them by
+CONVERSIONS = {
+    "►f↔d": "f<>d", ">f<>d": "f<>d",
+    "►A B/C↔D/E": "abc<>de", ">A B/C<>D/E": "abc<>de",
+    "►DMS": "dms",
+}
+
+# Calculator spellings of functions and the canonical name used in the AST
+FUNCTIONS = {
+    "sin": "sin", "cos": "cos", "tan": "tan",
+    "asin": "asin", "acos": "acos", "atan": "atan",
+    "log": "log", "ln": "ln", "abs": "abs",
+    "rand": "rand", "randi": "randi",
+    "R►Pr": "r_to_p_r", "R►Pθ": "r_to_p_theta",
+    "P►Rx": "p_to_r_x", "P►Ry": "p_to_r_y",
+    "primepi": "prime_pi", "nthprime": "nth_prime", "nextprime": "next_prime",
+}
+
+CONSTANTS = {"π": "pi", "e": "e"}
+
+# Binding powers for the Pratt parser (higher binds tighter)
+_INFIX_BP = {
+    "+": 10, "-": 10,
+    "*": 20, "/": 20, "÷": 20,
+    "nPr": 35, "nCr": 35,
+    "^": 40, "X√": 40,
+}
+_RIGHT_ASSOC = {"^", "X√"}
+_PREFIX_BP = 30
+_POSTFIX_BP = 50
+_POSTFIX = {"!", "%", "°", "┘", "r", "g"}
+
+
+@dataclass
+class Token:
+    kind: str
+    text: str
+    pos: int
+
+
+@dataclass
+class ParsedExpression:
+    body: tuple                                       # AST root node
+    store_to: Optional[str] = None                    # ►a .. ►e, ►r
+    conversion: Optional[str] = None                  # 'f<>d', 'abc<>de' or 'dms'
+    has_mixed_fraction: bool = False                  # Input contained w┘n/d
+    variables: Tuple[str, ...] = field(default_factory=tuple)
+
+
+_NAME_RE = re.compile(dict(_TOKEN_PATTERNS)["name"])
+
+
+def _ends_value(token: Token) -> bool:
+    return token.kind in ("number", "name", "exponent") or token.text in (")", "!", "%")
+
+
+def tokenize(expression: str) -> List[Token]:
+    tokens = []
+    pos = 0
+    length = len(expression)
+    while pos < length:
+        match = _TOKEN_RE.match(expression, pos)
+        if match is None:
+            raise ValueError(f"Unexpected '{expression[pos]}'")
+        kind = match.lastgroup
+        if kind == "exponent" and not (tokens and _ends_value(tokens[-1])):
+            # A bare E not following a value is the E register, as in E+2
+            match = _NAME_RE.match(expression, pos)
+            kind = "name"
+        if kind != "ws":
+            text = match.group()
+            if kind == "func" and "^" in text:
+                # sin^(-1) and friends are just spellings of asin/acos/atan
+                text = "a" + text[:3]
+            elif kind == "store":
+                text = text[1:]
+            tokens.append(Token(kind, text, pos))
+        pos = match.end()
+    tokens.append(Token("end", "", length))
+    return tokens
+
+
+class Parser:
+    """Precedence-climbing parser turning calculator input into a tuple AST.
+
+    Nodes are plain tuples tagged by their first element:
+    ('num', value), ('const', name), ('var', name), ('unary', op, x),
+    ('binary', op, left, right), ('postfix', op, x), ('postfix', 'E', x, power),
+    ('call', func, args), ('dms', degrees, minutes, seconds) and
+    ('mixed', whole, numerator, denominator).
+    """
+
+    def __init__(self, tokens: List[Token], variables=()):
+        self.tokens = tokens
+        self.index = 0
+        self.variables = tuple(variables)
+        self.has_mixed_fraction = False
+
+    def peek(self, offset=0) -> Token:
+        return self.tokens[min(self.index + offset, len(self.tokens) - 1)]
+
+    def advance(self) -> Token:
+        token = self.tokens[self.index]
+        if token.kind != "end":
+            self.index += 1
+        return token
+
+    def expect_close(self):
+        # A missing ')' at the very end is closed implicitly, like the calculator does
+        token = self.peek()
+        if token.kind == "end":
+            return
+        if token.text != ")":
+            raise self.error(token)
+        self.advance()
+
+    def error(self, token: Token) -> ValueError:
+        if token.kind == "end":
+            return ValueError("Unexpected end of expression")
+        return ValueError(f"Unexpected '{token.text}'")
+
+    def parse(self) -> ParsedExpression:
+        if self.peek().kind == "end":
+            raise ValueError("Empty expression")
+        body = self.parse_expression(0)
+
+        # Conversions and memory storage can only trail the expression
+        result = ParsedExpression(body=body, variables=self.variables)
+        while self.peek().kind in ("convert", "store"):
+            token = self.advance()
+            if token.kind == "convert" and result.conversion is None:
+                result.conversion = CONVERSIONS[token.text]
+            elif token.kind == "store" and result.store_to is None:
+                result.store_to = token.text
+            else:
+                raise self.error(token)
+        if self.peek().kind != "end":
+            raise self.error(self.peek())
+
+        result.has_mixed_fraction = self.has_mixed_fraction
+        return result
+
+    def parse_expression(self, rbp: int) -> tuple:
+        left = self.nud(self.advance())
+        while rbp < self.left_binding_power(self.peek()):
+            left = self.led(self.advance(), left)
+        return left
+
+    def left_binding_power(self, token: Token) -> int:
+        if token.kind == "exponent":
+            return _POSTFIX_BP
+        if token.kind == "op":
+            if token.text in _POSTFIX:
+                return _POSTFIX_BP
+            return _INFIX_BP.get(token.text, 0)
+        if token.kind == "name" and token.text in ("r", "g"):
+            return _POSTFIX_BP
+        return 0
+
+    def nud(self, token: Token) -> tuple:
+        if token.kind == "number":
+            text = token.text.replace("(-)", "-")
+            if "." in text or "E" in text:
+                value = float(text)
+                if math.isinf(value):
+                    raise OverflowError(f"{token.text} is too large")
+                return ("num", value)
+            return ("num", int(text))
+
+        if token.kind == "neg" or token.text in ("-", "+"):
+            op = "+" if token.text == "+" else "-"
+            return ("unary", op, self.parse_expression(_PREFIX_BP))
+
+        if token.text == "(":
+            inner = self.parse_expression(0)
+            self.expect_close()
+            return inner
+
+        # √( and X√( with no index in front are both plain square roots
+        if token.text in ("√", "X√"):
+            return ("call", "sqrt", [self.parse_expression(_INFIX_BP["^"] - 1)])
+
+        if token.kind == "func":
+            return self.parse_call(FUNCTIONS[token.text], token)
+
+        if token.kind == "name":
+            if token.text in FUNCTIONS:
+                if token.text == "rand" and self.peek().text != "(":
+                    return ("call", "rand", [])
+                return self.parse_call(FUNCTIONS[token.text], token)
+            if token.text in CONSTANTS:
+                return ("const", CONSTANTS[token.text])
+            if token.text in self.variables:
+                return ("var", token.text)
+            raise ValueError(f"Unknown name '{token.text}'")
+
+        raise self.error(token)
+
+    def parse_call(self, func: str, token: Token) -> tuple:
+        if self.peek().text != "(":
+            raise ValueError(f"'{token.text}' needs '('")
+        self.advance()
+
+        args = []
+        if self.peek().text != ")" and self.peek().kind != "end":
+            args.append(self.parse_expression(0))
+            while self.peek().text == ",":
+                self.advance()
+                args.append(self.parse_expression(0))
+        self.expect_close()
+        return ("call", func, args)
+
+    def led(self, token: Token, left: tuple) -> tuple:
+        op = token.text
+
+        if token.kind == "exponent":
+            # EE after a name or bracket, e.g. AnsE2
+            return ("postfix", "E", left, int(op[1:].replace("(-)", "-")))
+
+        if op in ("r", "g"):
+            return ("postfix", op, left)
+
+        if op == "°":
+            return self.parse_dms(left)
+
+        if op == "┘":
+            return self.parse_mixed_fraction(left)
+
+        if op in ("!", "%"):
+            return ("postfix", op, left)
+
+        bp = _INFIX_BP[op]
+        right = self.parse_expression(bp - 1 if op in _RIGHT_ASSOC else bp)
+        if op == "÷":
+            op = "/"
+        return ("binary", op, left, right)
+
+    def parse_dms(self, degrees: tuple) -> tuple:
+        # 5°, 5°5' and 5°5'5" are all accepted
+        minutes = seconds = ("num", 0)
+        if self.peek().kind == "number" and self.peek(1).text == "'":
+            minutes = self.nud(self.advance())
+            self.advance()
+            if self.peek().kind == "number" and self.peek(1).text == '"':
+                seconds = self.nud(self.advance())
+                self.advance()
+        return ("dms", degrees, minutes, seconds)
+
+    def parse_mixed_fraction(self, whole: tuple) -> tuple:
+        numerator = self.advance()
+        slash = self.advance()
+        denominator = self.advance()
+        if numerator.kind != "number" or slash.text not in ("/", "÷") or denominator.kind != "number":
+            raise ValueError("Mixed fractions must look like w┘n/d")
+        self.has_mixed_fraction = True
+        return ("mixed", whole, self.nud(numerator), self.nud(denominator))
+
+
+def parse(expression: str, variables=()) -> ParsedExpression:
+    return Parser(tokenize(expression), variables).parse()
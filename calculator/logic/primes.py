@@ -0,0 +1,177 @@
+import math
+from functools import lru_cache
+import numpy as np
+from .num import is_prime, primes_below
+from .state_manager import get_state_file_path
+
+# Odd numbers per sieve segment; a segment is 1 MiB of bits on disk
+SEGMENT_ODDS = 1 << 23
+SEGMENT_BYTES = SEGMENT_ODDS // 8
+
+# The sieve covers numbers below this (about 600 MiB of cache); next_prime steps past it with is_prime
+SIEVE_LIMIT = 10 ** 10
+
+# Set bits in each byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+class PrimeSieve:
+    """Segmented odd-only sieve of Eratosthenes, cached on disk.
+
+    Bit i of the cache file is set when 2i + 1 is prime. Segments are sieved on
+    first use and written at their own offset, so two processes filling the same
+    segment write the same bytes. A second file keeps each segment's prime count.
+    Queries read the cache through a memory map, one segment at a time.
+    """
+
+    def __init__(self, directory=None):
+        directory = get_state_file_path().parent if directory is None else directory
+        self.bits_path = directory / "primes.bits"
+        self.counts_path = directory / "primes.counts"
+        self.base_primes = np.array([], dtype=np.int64)
+
+    def segments(self):
+        # Complete segments on disk, maybe written by another process since last time
+        bits = self.bits_path.stat().st_size // SEGMENT_BYTES if self.bits_path.exists() else 0
+        counts = self.counts_path.stat().st_size // 8 if self.counts_path.exists() else 0
+        return min(bits, counts)
+
+    def ensure(self, stop):
+        """Sieve and save every segment holding numbers below stop; returns the segment count"""
+        if stop > SIEVE_LIMIT:
+            raise ValueError(f"The prime sieve only goes up to {SIEVE_LIMIT:.0e}")
+        needed = -(-stop // (2 * SEGMENT_ODDS))
+        present = self.segments()
+        for index in range(present, needed):
+            packed, count = self.sieve_segment(index)
+            self._write(self.bits_path, index * SEGMENT_BYTES, packed.tobytes())
+            self._write(self.counts_path, index * 8, np.array([count], dtype=np.int64).tobytes())
+        return max(present, needed)
+
+    @staticmethod
+    def _write(path, offset, data):
+        with open(path, "r+b" if path.exists() else "w+b") as f:
+            f.seek(offset)
+            f.write(data)
+
+    def sieve_segment(self, index):
+        # (packed bits, prime count) for the odd numbers 2i + 1 with i in the segment
+        low = 2 * index * SEGMENT_ODDS  # segment holds low + 1, low + 3, ..., low + 2·SEGMENT_ODDS - 1
+        high = low + 2 * SEGMENT_ODDS
+        root = math.isqrt(high)
+        if not self.base_primes.size or self.base_primes[-1] < root:
+            # Odd primes to well past the root, so the next few segments can reuse them
+            self.base_primes = np.array(primes_below(2 * root + 2)[1:], dtype=np.int64)
+
+        candidates = np.ones(SEGMENT_ODDS, dtype=bool)
+        if index == 0:
+            candidates[0] = False  # 1
+        for p in self.base_primes:
+            p = int(p)
+            if p > root:
+                break
+            # First odd multiple of p in the segment, and never p itself
+            first = max(p * p, (low + 1 + p - 1) // p * p)
+            if first % 2 == 0:
+                first += p
+            candidates[(first - low - 1) // 2::p] = False
+        return np.packbits(candidates, bitorder="little"), int(candidates.sum())
+
+    def bits(self, segments):
+        return np.memmap(self.bits_path, dtype=np.uint8, mode="r", shape=(segments * SEGMENT_BYTES,))
+
+    def counts(self, segments):
+        return np.fromfile(self.counts_path, dtype=np.int64, count=segments)
+
+    def segment_primes(self, bits, index):
+        # The primes in one segment as an array
+        odd = np.unpackbits(bits[index * SEGMENT_BYTES:(index + 1) * SEGMENT_BYTES], bitorder="little")
+        return 2 * (index * SEGMENT_ODDS + np.flatnonzero(odd)) + 1
+
+    def primes_in(self, a, b):
+        """Primes p with a ≤ p < b, as an int64 array"""
+        a = max(a, 2)
+        if b <= a:
+            return np.array([], dtype=np.int64)
+        segments = self.ensure(b)
+        bits = self.bits(segments)
+        pieces = [np.array([2], dtype=np.int64)] if a == 2 else []
+        for index in range((a - 1) // (2 * SEGMENT_ODDS), -(-b // (2 * SEGMENT_ODDS))):
+            primes = self.segment_primes(bits, index)
+            pieces.append(primes[(primes >= a) & (primes < b)])
+        return np.concatenate(pieces) if pieces else np.array([], dtype=np.int64)
+
+    def prime_pi(self, x):
+        """Number of primes ≤ x"""
+        if x < 2:
+            return 0
+        segments = self.ensure(x + 1)
+        bits, counts = self.bits(segments), self.counts(segments)
+        end = (x - 1) // 2 + 1  # odd indices with 2i + 1 ≤ x
+        index = end // SEGMENT_ODDS
+        total = 1 + int(counts[:index].sum())  # 1 for the prime 2
+        start_byte, end_byte = index * SEGMENT_BYTES, end // 8
+        total += int(_POPCOUNT[bits[start_byte:end_byte]].sum(dtype=np.int64))
+        if end % 8:
+            total += int(_POPCOUNT[bits[end_byte] & ((1 << end % 8) - 1)])
+        return total
+
+    def nth_prime(self, k):
+        """The k-th prime, counting 2 as the first"""
+        if k < 1:
+            raise ValueError("nth_prime needs k ≥ 1")
+        if k == 1:
+            return 2
+        # Grow the cache a segment at a time until it holds k - 1 odd primes
+        segments = max(self.segments(), 1)
+        while True:
+            segments = self.ensure(segments * 2 * SEGMENT_ODDS)
+            totals = np.cumsum(self.counts(segments))
+            if totals[-1] >= k - 1:
+                break
+            segments += 1
+        index = int(np.searchsorted(totals, k - 1))
+        before = int(totals[index - 1]) if index else 0
+        return int(self.segment_primes(self.bits(segments), index)[k - 2 - before])
+
+    def next_prime(self, n):
+        """Smallest prime > n"""
+        if n < 2:
+            return 2
+        candidate = n + 1 if n % 2 == 0 else n + 2
+        index = (candidate - 1) // 2  # odd index to start from
+        while 2 * index + 1 < SIEVE_LIMIT:
+            segment = index // SEGMENT_ODDS
+            segments = self.ensure(min((segment + 1) * 2 * SEGMENT_ODDS, SIEVE_LIMIT))
+            primes = self.segment_primes(self.bits(segments), segment)
+            primes = primes[primes > n]
+            if primes.size:
+                return int(primes[0])
+            index = (segment + 1) * SEGMENT_ODDS
+        candidate = max(candidate, SIEVE_LIMIT + 1)
+        while not is_prime(candidate):
+            candidate += 2
+        return candidate
+
+@lru_cache(maxsize=1)
+def default_sieve():
+    return PrimeSieve()
+
+def integer_argument(x):
+    # Calculator values arrive as floats as often as ints
+    if isinstance(x, float):
+        if not x.is_integer():
+            raise ValueError("Prime functions need whole numbers")
+        x = int(x)
+    return x
+
+def primes_in(a, b):
+    return default_sieve().primes_in(integer_argument(a), integer_argument(b))
+
+def prime_pi(x):
+    return default_sieve().prime_pi(integer_argument(x))
+
+def nth_prime(k):
+    return default_sieve().nth_prime(integer_argument(k))
+
+def next_prime(n):
+    return default_sieve().next_prime(integer_argument(n))
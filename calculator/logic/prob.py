@@ -1,6 +1,15 @@
 import random
 import math
 
+# Exact integer results needing more bits than this are refused before they're computed
+MAX_RESULT_BITS = 1 << 20
+# math.comb slows down roughly quadratically in the result size, so it gets a tighter budget
+MAX_COMBINATION_BITS = 1 << 16
+
+def result_bits(log_value):
+    # Size in bits of a result whose natural log is log_value
+    return log_value / math.log(2)
+
 def factorial(n):
     if not isinstance(n, int) or n < 0:
         raise ValueError("Factorial requires a non-negative integer")
@@ -15,8 +24,10 @@ def permutation(n, r):
         raise ValueError("Permutation requires non-negative values")
     if r > n:
         raise ValueError("r cannot be greater than n in permutation")
+    if result_bits(math.lgamma(n + 1) - math.lgamma(n - r + 1)) > MAX_RESULT_BITS:
+        raise OverflowError("Permutation too large to compute")
     
-    return math.factorial(n) // math.factorial(n - r)
+    return math.perm(n, r)
 
 def combination(n, r):
     if not (isinstance(n, int) and isinstance(r, int)):
@@ -25,8 +36,10 @@ def combination(n, r):
         raise ValueError("Combination requires non-negative values")
     if r > n:
         raise ValueError("r cannot be greater than n in combination")
+    if result_bits(math.lgamma(n + 1) - math.lgamma(r + 1) - math.lgamma(n - r + 1)) > MAX_COMBINATION_BITS:
+        raise OverflowError("Combination too large to compute")
     
-    return math.factorial(n) // (math.factorial(r) * math.factorial(n - r))
+    return math.comb(n, r)
 
 def rand(seed=None):
     if seed is not None and seed != 0:
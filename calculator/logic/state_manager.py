@@ -12,6 +12,21 @@ logger = logging.getLogger(__name__)
 # Current state format version
 STATE_VERSION = 1
 
+# Integers wider than this are saved as hex text; decimal conversion of very
+# large ints is refused by Python (and json) past 4300 digits
+MAX_DECIMAL_BITS = 10000
+
+def encode_value(value):
+    # Ans and the registers hold raw results, which may be huge integers
+    if isinstance(value, int) and abs(value).bit_length() > MAX_DECIMAL_BITS:
+        return hex(value)
+    return value
+
+def decode_value(value):
+    if isinstance(value, str) and value.lstrip("-").startswith("0x"):
+        return int(value, 16)
+    return value
+
 def get_state_file_path():    
     # Detect operating system
     system = platform.system()
@@ -44,8 +59,8 @@ def save_calculator_state(calculator):
         state = {
             'version': STATE_VERSION,
             'memory': {
-                'registers': calculator.memory_values,
-                'rand_value': calculator.rand_value
+                'registers': {name: encode_value(value) for name, value in calculator.memory_values.items()},
+                'rand_value': encode_value(calculator.rand_value)
             },
             'display': {
                 'angle_mode': calculator.angle_mode,
@@ -53,7 +68,7 @@ def save_calculator_state(calculator):
                 'decimal_places': calculator.decimal_places
             },
             'values': {
-                'ans': calculator.ans,
+                'ans': encode_value(calculator.ans),
                 'k_value': calculator.k_value,
                 'k_mode_active': calculator.k_mode_active
             },
@@ -110,8 +125,9 @@ def load_calculator_state(calculator):
         
         # Apply memory values
         if 'memory' in state:
-            calculator.memory_values = state['memory'].get('registers', calculator.memory_values)
-            calculator.rand_value = state['memory'].get('rand_value', calculator.rand_value)
+            registers = state['memory'].get('registers', calculator.memory_values)
+            calculator.memory_values = {name: decode_value(value) for name, value in registers.items()}
+            calculator.rand_value = decode_value(state['memory'].get('rand_value', calculator.rand_value))
         
         # Apply display settings
         if 'display' in state:
@@ -121,7 +137,7 @@ def load_calculator_state(calculator):
             
         # Apply values
         if 'values' in state:
-            calculator.ans = state['values'].get('ans', calculator.ans)
+            calculator.ans = decode_value(state['values'].get('ans', calculator.ans))
             calculator.k_value = state['values'].get('k_value', calculator.k_value)
             calculator.k_mode_active = state['values'].get('k_mode_active', calculator.k_mode_active)
             
@@ -0,0 +1,156 @@
+import math
+from functools import lru_cache, partial
+from types import SimpleNamespace
+import numpy as np
+from .parser import parse, FUNCTIONS, CONSTANTS
+from .evaluator import ast_to_python, build_trig_functions
+
+# Stand-in for the math module so generated code calls ufuncs instead of scalar functions
+NUMPY_MATH = SimpleNamespace(
+    pi=np.pi, e=np.e,
+    sin=np.sin, cos=np.cos, tan=np.tan,
+    asin=np.arcsin, acos=np.arccos, atan=np.arctan,
+    sinh=np.sinh, cosh=np.cosh, tanh=np.tanh,
+    asinh=np.arcsinh, acosh=np.arccosh, atanh=np.arctanh,
+    log10=np.log10, log=np.log, sqrt=np.sqrt, pow=np.power,
+)
+
+# n! is exact in float64 up to 22! and finite up to 170!
+_FACTORIALS = np.array([float(math.factorial(k)) for k in range(171)])
+
+@lru_cache(maxsize=64)
+def compile_vectorized(expression: str, variable: str = "x"):
+    if variable in FUNCTIONS or variable in CONSTANTS or variable in ("r", "g"):
+        raise ValueError(f"'{variable}' cannot be used as a variable name")
+
+    parsed = parse(expression, variables=(variable,))
+    if parsed.conversion is not None or parsed.store_to is not None:
+        raise ValueError("Conversions and memory storage are not supported over arrays")
+    source = ast_to_python(parsed.body)
+    return compile(source, "<vectorized>", "eval")
+
+def evaluate_vectorized(expression: str, values, variable: str = "x", angle_mode: str = "rad",
+                        hyp: bool = False, rand_seed=None) -> np.ndarray:
+    """Evaluate an expression in one free variable over a whole array of inputs"""
+    values = np.asarray(values, dtype=float)
+    code = compile_vectorized(expression.strip(), variable)
+    namespace = build_vector_namespace(values.shape, angle_mode, hyp, rand_seed)
+
+    with np.errstate(all="ignore"):
+        result = eval(code, namespace, {variable: values})
+        result = np.broadcast_to(np.asarray(result, dtype=float), values.shape).copy()
+        return clean_floating_point_errors(result)
+
+def build_vector_namespace(shape, angle_mode="rad", hyp=False, rand_seed=None) -> dict:
+    rng = np.random.default_rng(int(rand_seed) if rand_seed else None)
+
+    namespace = {
+        "__builtins__": {},
+        "math": NUMPY_MATH,
+        "factorial": factorial,
+        "permutation": permutation,
+        "combination": combination,
+        "power": np.float_power,
+        "rand": lambda: rng.random(shape),
+        "randi": lambda min_val=0, max_val=100: rng.integers(
+            np.asarray(min_val, dtype=np.int64), np.asarray(max_val, dtype=np.int64) + 1, size=shape
+        ).astype(float),
+        "abs": np.abs,
+        "dms_to_decimal": partial(dms_to_decimal, angle_mode=angle_mode),
+        "rad_to_angle_mode": partial(rad_to_angle_mode, angle_mode=angle_mode),
+        "grad_to_angle_mode": partial(grad_to_angle_mode, angle_mode=angle_mode),
+        "rectangular_to_polar_r": rectangular_to_polar_r,
+        "rectangular_to_polar_theta": partial(rectangular_to_polar_theta, angle_mode=angle_mode),
+        "polar_to_rectangular_x": partial(polar_to_rectangular_x, angle_mode=angle_mode),
+        "polar_to_rectangular_y": partial(polar_to_rectangular_y, angle_mode=angle_mode),
+    }
+    namespace.update(build_trig_functions(angle_mode, hyp, lib=NUMPY_MATH))
+    return namespace
+
+def clean_floating_point_errors(result: np.ndarray) -> np.ndarray:
+    # Same rules as the scalar evaluator: snap to zero and to nearby integers
+    nearest = np.rint(result)
+    result = np.where(np.abs(result - nearest) < 1e-10, nearest, result)
+    result[np.abs(result) < 1e-10] = 0.0
+    return result
+
+def _as_count(n):
+    # Integer-valued inputs as int64 indices, with everything else flagged invalid
+    n = np.asarray(n, dtype=float)
+    valid = np.isfinite(n) & (n >= 0) & (n == np.floor(n))
+    return np.where(valid, n, 0).astype(np.int64), valid
+
+# log(k!) from a fixed table for small k and lgamma beyond it, so memory
+# doesn't grow with the largest input
+_LOG_FACTORIALS = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, 1 << 16, dtype=float)))))
+_log_gamma = np.vectorize(math.lgamma, otypes=[float])
+
+def _log_factorial(k: np.ndarray) -> np.ndarray:
+    small = k < len(_LOG_FACTORIALS)
+    result = np.empty(k.shape)
+    result[small] = _LOG_FACTORIALS[k[small]]
+    result[~small] = _log_gamma(k[~small] + 1.0)
+    return result
+
+def factorial(n):
+    k, valid = _as_count(n)
+    result = np.full(k.shape, np.inf)
+    small = k < len(_FACTORIALS)
+    result[small] = _FACTORIALS[k[small]]
+    return np.where(valid, result, np.nan)
+
+def permutation(n, r):
+    n, valid_n = _as_count(n)
+    r, valid_r = _as_count(r)
+    valid = valid_n & valid_r & (r <= n)
+    result = np.rint(np.exp(_log_factorial(n) - _log_factorial(np.where(valid, n - r, 0))))
+    return np.where(valid, result, np.nan)
+
+def combination(n, r):
+    n, valid_n = _as_count(n)
+    r, valid_r = _as_count(r)
+    valid = valid_n & valid_r & (r <= n)
+    r = np.where(valid, r, 0)
+    result = np.rint(np.exp(_log_factorial(n) - _log_factorial(r) - _log_factorial(np.where(valid, n - r, 0))))
+    return np.where(valid, result, np.nan)
+
+def dms_to_decimal(degrees, minutes=0, seconds=0, angle_mode="rad"):
+    decimal_degrees = degrees + (minutes / 60) + (seconds / 3600)
+    if angle_mode == "rad":
+        return np.deg2rad(decimal_degrees)
+    elif angle_mode == "grd":
+        return decimal_degrees * 400 / 360
+    return decimal_degrees
+
+def rad_to_angle_mode(value, angle_mode="rad"):
+    if angle_mode == "deg":
+        return np.rad2deg(value)
+    elif angle_mode == "grd":
+        return value * 200 / np.pi
+    return value
+
+def grad_to_angle_mode(value, angle_mode="rad"):
+    if angle_mode == "rad":
+        return value * np.pi / 200
+    elif angle_mode == "deg":
+        return value * 9 / 10
+    return value
+
+def _to_radians(theta, angle_mode):
+    if angle_mode == "deg":
+        return np.deg2rad(theta)
+    elif angle_mode == "grd":
+        return theta * np.pi / 200
+    return theta
+
+def rectangular_to_polar_r(x, y):
+    return np.hypot(x, y)
+
+def rectangular_to_polar_theta(x, y, angle_mode="rad"):
+    return rad_to_angle_mode(np.arctan2(y, x), angle_mode)
+
+def polar_to_rectangular_x(r, theta, angle_mode="rad"):
+    return r * np.cos(_to_radians(theta, angle_mode))
+
+def polar_to_rectangular_y(r, theta, angle_mode="rad"):
+    return r * np.sin(_to_radians(theta, angle_mode))
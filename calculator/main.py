@@ -1,4 +1,5 @@
 # calculator/main.py
+import multiprocessing
 from PySide6.QtWidgets import QApplication # type: ignore
 from ui.main_window import MainWindow
 
@@ -13,4 +14,6 @@ def main():
     app.exec()               # Start the application's event loop
 
 if __name__ == "__main__":
+    # Needed for the NUM worker process in frozen (PyInstaller-style) Windows builds
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,252 @@
+# calculator/server.py
+# Local JSON-RPC evaluation service:
+#   python -m calculator.server --socket /tmp/calculator.sock
+#   python -m calculator.server --port 8765
+#
+# Requests and responses are newline-delimited JSON-RPC 2.0 objects, e.g.
+#   {"jsonrpc": "2.0", "id": 1, "method": "evaluate", "params": {"expression": "sin(90)", "angle_mode": "deg"}}
+#   {"jsonrpc": "2.0", "id": 2, "method": "number_theory", "params": {"n": 561, "fields": ["factorization"]}}
+# Requests on one connection may be pipelined; responses arrive as they finish, matched by id.
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+from .eval import json_raw_value
+from .logic.evaluator import evaluate_expression
+from .logic.num import NumberTheoryManager, RESULT_SOURCES
+
+DEFAULT_TIMEOUT = 10.0
+
+# evaluate_expression keywords a client may set
+EVALUATE_PARAMS = {"expression", "angle_mode", "output_format", "decimal_places", "ans", "hyp", "rand_seed", "modulus",
+                   "registers"}
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+TIMEOUT_ERROR = -32001
+
+class RequestError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+def evaluate(params):
+    unknown = set(params) - EVALUATE_PARAMS
+    if unknown or "expression" not in params:
+        raise RequestError(INVALID_PARAMS, f"evaluate takes {sorted(EVALUATE_PARAMS)} with 'expression' required")
+    if params.get("modulus") is not None:
+        # The MOD setting is text in the UI; accept it as a JSON number too
+        params["modulus"] = str(params["modulus"])
+    result = evaluate_expression(**params)
+    return {
+        'value': str(result['value']),
+        'raw_value': json_raw_value(result['raw_value']),
+        'store_to': result['store_to']
+    }
+
+def number_theory(params):
+    manager = NumberTheoryManager()
+    for field in ("n", "m", "a"):
+        value = params.get(field)
+        if value is not None and not isinstance(value, int):
+            raise RequestError(INVALID_PARAMS, f"{field} must be an integer")
+    manager.n_value = params.get("n")
+    manager.m_value = params.get("m")
+    manager.a_value = params.get("a")
+
+    # Only the requested fields are calculated; every field when none are named
+    fields = params.get("fields")
+    if fields is None:
+        fields = list(RESULT_SOURCES)
+    elif not isinstance(fields, list):
+        raise RequestError(INVALID_PARAMS, "fields must be a list")
+    unknown = [field for field in fields if field not in RESULT_SOURCES]
+    if unknown:
+        raise RequestError(INVALID_PARAMS, f"Unknown fields: {unknown}")
+
+    results = {}
+    for field in fields:
+        value = manager.result(field)
+        if field == "quadratic_residues" and value is not None:
+            # The residue set can be far too large to list; send its size and ends
+            value = {"count": len(value), "first": value.page(0, 1)[0], "last": value.last()}
+        results[field] = value
+    return results
+
+METHODS = {
+    "evaluate": evaluate,
+    "number_theory": number_theory,
+}
+
+def _worker_main(conn):
+    # Runs in each worker process: answer (method, params) messages until the pipe closes
+    while True:
+        try:
+            method, params = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send(("ok", METHODS[method](params)))
+        except RequestError as e:
+            conn.send(("error", (e.code, str(e))))
+        except Exception as e:
+            conn.send(("error", (SERVER_ERROR, f"{type(e).__name__}: {e}")))
+
+class Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+class WorkerPool:
+    """A fixed set of warm worker processes; a request that times out gets its worker replaced"""
+
+    def __init__(self, size=None):
+        self.context = multiprocessing.get_context()
+        self.size = size or os.cpu_count() or 1
+        self.idle = asyncio.Queue()
+        for _ in range(self.size):
+            self.idle.put_nowait(Worker(self.context))
+
+    async def call(self, method, params, timeout):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            # Waiting for a free worker counts against the same deadline
+            worker = await asyncio.wait_for(self.idle.get(), timeout)
+        except asyncio.TimeoutError:
+            raise RequestError(TIMEOUT_ERROR, f"Request timed out after {timeout:g}s")
+        try:
+            worker.conn.send((method, params))
+            remaining = max(deadline - loop.time(), 0)
+            status, payload = await asyncio.wait_for(loop.run_in_executor(None, worker.conn.recv), remaining)
+        except asyncio.TimeoutError:
+            # The only way to stop a CPU-bound job is to kill its process
+            worker.kill()
+            worker = Worker(self.context)
+            raise RequestError(TIMEOUT_ERROR, f"Request timed out after {timeout:g}s")
+        except (EOFError, OSError):
+            # The worker died mid-request (crash, out of memory, killed from outside)
+            worker.kill()
+            worker = Worker(self.context)
+            raise RequestError(SERVER_ERROR, "Worker process exited")
+        finally:
+            self.idle.put_nowait(worker)
+
+        if status == "error":
+            raise RequestError(*payload)
+        return payload
+
+    def close(self):
+        while not self.idle.empty():
+            self.idle.get_nowait().kill()
+
+class CalculatorServer:
+    def __init__(self, workers=None, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.pool = WorkerPool(workers)
+
+    async def handle_connection(self, reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # Each request runs as its own task so a slow one doesn't hold up the rest
+                task = asyncio.create_task(self.respond(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def respond(self, line, writer, write_lock):
+        response = await self.dispatch(line)
+        try:
+            text = json.dumps(response, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            # e.g. a number-theory result too large to write as a JSON number
+            error = {"code": SERVER_ERROR, "message": f"Result could not be encoded: {e}"}
+            text = json.dumps({"jsonrpc": "2.0", "id": response.get("id"), "error": error})
+        async with write_lock:
+            writer.write((text + "\n").encode("utf-8"))
+            await writer.drain()
+
+    async def dispatch(self, line):
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise RequestError(PARSE_ERROR, "Invalid JSON")
+            if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+                raise RequestError(INVALID_REQUEST, "Expected an object with a 'method'")
+            request_id = request.get("id")
+
+            method = request["method"]
+            if method not in METHODS:
+                raise RequestError(METHOD_NOT_FOUND, f"Unknown method '{method}'")
+            params = request.get("params", {})
+            if not isinstance(params, dict):
+                raise RequestError(INVALID_PARAMS, "params must be an object")
+
+            # Clients may ask for a shorter timeout than the server's, never a longer one
+            timeout = request.get("timeout", self.timeout)
+            if not isinstance(timeout, (int, float)) or timeout <= 0:
+                raise RequestError(INVALID_REQUEST, "timeout must be a positive number")
+            timeout = min(timeout, self.timeout)
+
+            result = await self.pool.call(method, params, timeout)
+            return {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except RequestError as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": e.code, "message": str(e)}}
+
+    def close(self):
+        self.pool.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m calculator.server",
+                                     description="Serve calculator evaluation over local JSON-RPC.")
+    parser.add_argument("--socket", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="per-request timeout in seconds")
+    return parser.parse_args(argv)
+
+async def serve(args):
+    calculator_server = CalculatorServer(workers=args.workers, timeout=args.timeout)
+    try:
+        if args.socket:
+            server = await asyncio.start_unix_server(calculator_server.handle_connection, path=args.socket)
+        else:
+            server = await asyncio.start_server(calculator_server.handle_connection, args.host, args.port)
+        async with server:
+            await server.serve_forever()
+    finally:
+        calculator_server.close()
+
+def main(argv=None):
+    try:
+        asyncio.run(serve(parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
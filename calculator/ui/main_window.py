@@ -8,6 +8,8 @@ from logic.statvar_menu import StatVarMenuManager
 from .manual import ManualWindow
 from logic.num import NumberTheoryManager
 from logic.numvar_menu import NumVarMenuManager
+from logic.num_jobs import NumberTheoryJobs, PENDING
+from logic.evaluator import REGISTER_NAMES
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -16,7 +18,13 @@ class MainWindow(QMainWindow):
         self.statvar_menu = StatVarMenuManager()
         
         self.num_manager = NumberTheoryManager()
-        self.numvar_menu = NumVarMenuManager()
+        self.num_jobs = NumberTheoryJobs()
+        self.numvar_menu = NumVarMenuManager(jobs=self.num_jobs)
+        
+        # NUM results are calculated in a worker process; check on it from the event loop
+        self.num_job_timer = QTimer(self)
+        self.num_job_timer.timeout.connect(self.poll_num_jobs)
+        self.num_job_timer.start(50)
         
         self.key_buffer = ""
         self.cursor_position = 0
@@ -30,7 +38,7 @@ class MainWindow(QMainWindow):
         self.output_format = "flo"
         self.decimal_places = None  # Default is None (F), meaning flexible decimal places
         self._original_sender = self.sender
-        self.ans = "0"  # Initialize ans variable
+        self.ans = 0  # Raw value of the last result, bound as Ans
         self.is_in_hyp = False  
         self.k_value = ""  # Store the K value entered by user
         self.k_mode_active = False  # Track if K mode is active
@@ -645,6 +653,8 @@ class MainWindow(QMainWindow):
             # Check for Enter/Return FIRST (before left/right keys)
             if event.key() == Qt.Key_Return or event.key() == Qt.Key_Enter:
                 result_value = self.display_result.text()
+                if result_value == PENDING:
+                    return  # Nothing to copy until the result arrives
                 
                 # Deactivate the menu
                 self.numvar_menu.active = False
@@ -694,7 +704,8 @@ class MainWindow(QMainWindow):
                 "fix": "FIX", "menu": "MENU", "abs": "ABS", # Other functions
                 "deg": "deg", "rad": "rad", "grd": "grd", # Angle modes
                 "ins": "INS",  # Insert mode
-                "mod": "MOD", "num": "NUM"  # number theoretic options
+                "mod": "MOD", "num": "NUM",  # number theoretic options
+                "primepi": "primepi(", "nthprime": "nthprime(", "nextprime": "nextprime(",  # Prime functions
             }
 
             # Check if buffer matches a valid function
@@ -1533,7 +1544,7 @@ class MainWindow(QMainWindow):
             self.display_input.setText("0")
             self.display_result.setText("")
             self.cursor_position = 0
-            self.ans = "0"
+            self.ans = 0
             self.memory_values = {'a': 0, 'b': 0, 'c': 0, 'd': 0, 'e': 0}
             self.rand_value = 0
             self.session_memory = []
@@ -2396,6 +2407,9 @@ class MainWindow(QMainWindow):
                 self.current_input = "0"
                 self.cursor_position = 0
             else:
+                # n, m and a are about to change, so any running NUM job is stale
+                self.num_jobs.cancel()
+                
                 # Start number theory data entry
                 # Use the mod_value if it exists as default modulus
                 success, prompt = self.num_manager.start_data_entry(default_mod=self.mod_value if self.mod_mode_active else None)
@@ -2410,6 +2424,11 @@ class MainWindow(QMainWindow):
             
             self.update_display_with_cursor()
             
+    def poll_num_jobs(self):
+        # Show a NUM result once the worker process has it
+        if self.numvar_menu.poll():
+            self.display_result.setText(str(self.numvar_menu.get_current_value()))
+            
     def add_equals(self):
         # Handle STATVAR menu first (because it overrides other behavior)
         if self.statvar_menu.active:
@@ -2517,11 +2536,8 @@ class MainWindow(QMainWindow):
                     self.current_input = result
                     self.display_input.setText(result)
                 else:  # RCL mode
-                    # Just insert the memory value
-                    if selected_var == 'r':
-                        value = self.rand_value
-                    else:
-                        value = self.memory_values[selected_var]
+                    # Insert the register's name; its value is bound when the expression is evaluated
+                    value = REGISTER_NAMES[selected_var]
                         
                     if self.pop_menu_state():
                         # We popped back to another menu
@@ -2584,7 +2600,7 @@ class MainWindow(QMainWindow):
                     self.angle_mode = "rad"
                     self.output_format = "flo"
                     self.decimal_places = None
-                    self.ans = "0"
+                    self.ans = 0
                     self.is_in_hyp = False
                     self.memory_values = {'a': 0, 'b': 0, 'c': 0, 'd': 0, 'e': 0}
                     self.rand_value = 0
@@ -2627,13 +2643,13 @@ class MainWindow(QMainWindow):
             elif self.menu_type == "prb":
                 # Get the selected function based on cursor position
                 if self.cursor_position == 0:  # nPr
-                    input_text = self.current_input if self.current_input != "0" else "ans"
+                    input_text = self.current_input if self.current_input != "0" else "Ans"
                     function_text = f"{input_text} nPr "
                 elif self.cursor_position == 4:  # nCr
-                    input_text = self.current_input if self.current_input != "0" else "ans"
+                    input_text = self.current_input if self.current_input != "0" else "Ans"
                     function_text = f"{input_text} nCr "
                 elif self.cursor_position == 8:  # !
-                    input_text = self.current_input if self.current_input != "0" else "ans"
+                    input_text = self.current_input if self.current_input != "0" else "Ans"
                     function_text = f"{input_text}!"
                 elif self.cursor_position == 10:  # rand
                     function_text = "rand"
@@ -2814,7 +2830,8 @@ class MainWindow(QMainWindow):
                             ans=self.ans,
                             hyp=self.is_in_hyp,
                             rand_seed=self.rand_value,
-                            modulus=self.mod_value)
+                            modulus=self.mod_value,
+                            registers=dict(self.memory_values, r=self.rand_value))
 
         # Check if we need to store the result in memory
         if result_obj['store_to'] is not None:
@@ -2827,9 +2844,9 @@ class MainWindow(QMainWindow):
         # Display the result value
         self.display_result.setText(str(result_obj['value']))
 
-        # Update ans with the new result
-        self.ans = result_obj['value']
-        print(f"ans as seen AFTER all equals processing: {self.ans}")
+        # Update ans with the new result, keeping full precision; errors leave it alone
+        if result_obj['raw_value'] is not None:
+            self.ans = result_obj['raw_value']
 
         if current_text != "0" and not self.is_in_menu:
             # Don't add duplicate entries in a row
@@ -101,6 +101,9 @@ class ManualWindow(QDialog):
 | ins            | set ins mode                  | Edit Mode |
 | mod            | Enter the modulus menu        | Modulus Mode |
 | num            | Enter the number theory menu  | Number Theory |
+| primepi        | primepi( (primes ≤ x)         | Number Theory |
+| nthprime       | nthprime( (the k-th prime)    | Number Theory |
+| nextprime      | nextprime( (next prime > n)   | Number Theory |
 
 ### Numbers and Arithmetic
 - Enter numbers using the number keys (0-9)
@@ -112,7 +115,7 @@ class ManualWindow(QDialog):
 ### Memory Functions
 - STO> stores a value in memory (a, b, c, d, e, r)
 - r is used as a seed for the random functions and is not accessed by RCL
-- RCL recalls a stored value
+- RCL inserts the register's name (A, B, C, D, E) into the expression; its stored value is used when you press =
 
 ### Special Functions
 - 2ND activates the secondary function of buttons
@@ -150,15 +153,18 @@ class ManualWindow(QDialog):
 | Inv      | Modular inverse (x such that n⋅x ≡ 1 mod m) |
 | Ord      | Order of n mod m (smallest k such that n^k ≡ 1 mod m) |
 | Gen      | Generator check (returns "Yes" if n generates (ℤ/mℤ)*, "No" otherwise) |
-| QR       | Quadratic residues mod m (shows list of all values) |
+| QR       | Quadratic residues mod m (shows how many there are, then the first few and the last) |
 | Leg      | Legendre symbol (n/m) (1 if n is a quadratic residue mod m, -1 if not, 0 if m divides n) |
 | Jac      | Jacobi symbol (n/m) (generalizes Legendre to any odd modulus) |
 | DLog     | Discrete logarithm (returns x such that n^x ≡ a mod m) |
 | Per      | Pisano period (length of the Fibonacci sequence mod m) |
-| Knd      | Knödel check (returns "Yes" if a^(n-1) ≡ 1 mod n for all a coprime to n) |
+| Knd      | Knödel check (returns "Yes (k=…)" if x^(n-k) ≡ 1 mod n for all x coprime to n, with k = a if set, else 1; a must satisfy 0 < a < n) |
 | CbC      | Cubic classes (count of equivalence classes of binary cubic forms mod m) |
+| Sqr      | Square roots mod m (how many x have x² ≡ n mod m, then the first few and the last) |
+| PRt      | Smallest primitive root mod m (a generator of (ℤ/mℤ)*; None if there isn't one) |
 
 - Scroll through results using the arrow keys, and press enter to select the result of a function
+- Results are worked out in the background; a result still being calculated shows as …, and the keypad stays usable meanwhile
 
 ### Angle Modes
 - DRG cycles between Degree, Radian, and Gradian modes
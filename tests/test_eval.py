@@ -0,0 +1,30 @@
+import io
+import json
+from calculator.eval import evaluate_stream, main
+
+
+def run(lines, **settings):
+    output = io.StringIO()
+    evaluate_stream(lines, output, **settings)
+    return output.getvalue().splitlines()
+
+
+def test_plain_output_chains_ans():
+    assert run(["2+3\n", "Ans*2\n", "1÷0\n", "Ans+1\n"]) == ["5", "10", "Error: division by zero", "11"]
+
+
+def test_json_output():
+    records = [json.loads(line) for line in run(["sin(90)\n", "Ans+1\r\n", "1÷0\n", "2^20000\n"],
+                                                angle_mode="deg", as_json=True)]
+    assert records[0] == {'expression': "sin(90)", 'value': "1", 'raw_value': 1, 'error': None}
+    assert records[1]['expression'] == "Ans+1" and records[1]['raw_value'] == 2
+    assert records[2]['value'] is None and records[2]['error'] == "division by zero"
+    # Too wide for a JSON number: the formatted value is still there, the raw value isn't
+    assert records[3]['value'].startswith("3.98") and records[3]['raw_value'] is None and records[3]['error'] is None
+
+
+def test_main_reads_a_file(tmp_path, capsys):
+    path = tmp_path / "input.txt"
+    path.write_text("7 nCr 2\nAns-20\n", encoding="utf-8")
+    main([str(path), "--json"])
+    assert [json.loads(line)['value'] for line in capsys.readouterr().out.splitlines()] == ["21", "1"]
@@ -0,0 +1,35 @@
+import pytest
+from calculator.logic.evaluator import evaluate_expression, expression_cache_info, clear_expression_cache, evaluate_many
+
+
+def test_compiled_expressions_are_cached():
+    clear_expression_cache()
+    assert expression_cache_info()['size'] == 0
+    evaluate_expression("sin(30)+2", angle_mode="deg")
+    assert (expression_cache_info()['hits'], expression_cache_info()['misses']) == (0, 1)
+    # Same text in another mode reuses the compiled code; the mode only changes the namespace
+    assert evaluate_expression("sin(30)+2", angle_mode="deg")['value'] == "2.5"
+    assert evaluate_expression("sin(30)+2", angle_mode="rad")['value'] != "2.5"
+    assert (expression_cache_info()['hits'], expression_cache_info()['misses']) == (2, 1)
+    # Surrounding whitespace doesn't make a new entry; Ans and registers are bound, not compiled in
+    evaluate_expression("  sin(30)+2 ")
+    evaluate_expression("Ans+1", ans=1)
+    evaluate_expression("Ans+1", ans=2)
+    assert (expression_cache_info()['hits'], expression_cache_info()['misses']) == (4, 2)
+    clear_expression_cache()
+    assert expression_cache_info() == {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': expression_cache_info()['maxsize']}
+
+
+def test_evaluate_many_keeps_input_order():
+    expressions = [f"{i}^2" for i in range(40)] + ["1÷0", "sin(90)"]
+    expected = [evaluate_expression(expression, angle_mode="deg") for expression in expressions]
+    # Small chunks over several workers, so chunks can finish out of order
+    results = evaluate_many(expressions, parallel_threshold=1, max_workers=3, chunk_size=2, angle_mode="deg")
+    assert results == expected
+    assert results[-1]['value'] == "1"
+    assert evaluate_many([], parallel_threshold=1) == []
+
+
+@pytest.mark.parametrize("expression", ["9^9^9", "100000 nCr 50000", "1E308*10", "(10^400)^(10^400)"])
+def test_oversized_results_are_refused(expression):
+    assert evaluate_expression(expression)['value'] == "Error: too large"
@@ -0,0 +1,19 @@
+import pytest
+from calculator.logic.evaluator import evaluate_expression
+
+# Huge integers are rounded from their leading bits; ties must still round half-even
+HUGE_INTEGERS = [
+    ("2^200000", "sci", None, "9.98005x10^60205"),
+    ("2^200000", "eng", 0, "100x10^60204"),
+    ("100000015*10^400", "sci", 7, "1.0000002x10^408"),
+    ("100000025*10^400", "sci", 7, "1.0000002x10^408"),
+    ("100000015*10^5", "sci", 7, "1.0000002x10^13"),
+    ("999999500000", "flo", None, "1x10^12"),
+    ("999999499999", "eng", None, "999.999x10^9"),
+]
+
+
+@pytest.mark.parametrize("expression, output_format, decimal_places, expected", HUGE_INTEGERS)
+def test_huge_integers(expression, output_format, decimal_places, expected):
+    result = evaluate_expression(expression, output_format=output_format, decimal_places=decimal_places)
+    assert result['value'] == expected
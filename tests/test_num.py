@@ -0,0 +1,368 @@
+import itertools
+import math
+import pytest
+from calculator.logic.num import NumberTheoryManager, generator_array, iter_generators, primitive_root, chinese_remainder, sqrt_mod_prime, square_root_count, square_roots, QuadraticResidues, discrete_log, factorize, fibonacci_pair, pisano_period, carmichael_lambda, is_knodel, is_prime, is_primitive_root, multiplicative_order, extended_gcd, bezout_coefficients, primes_below, is_strong_lucas_probable_prime, pollard_brent, perfect_power, cached_factorization, factorization_cache_info, clear_factorization_cache
+from calculator.logic.numvar_menu import NumVarMenuManager
+
+
+def knodel_by_powers(n, k):
+    return all(pow(a, n - k, n) == 1 for a in range(1, n) if math.gcd(a, n) == 1)
+
+
+def test_is_prime_matches_a_sieve():
+    limit = 2 * 10 ** 5
+    sieve = set(primes_below(limit))
+    assert [n for n in range(limit) if is_prime(n)] == sorted(sieve)
+
+
+def test_is_prime_large_values():
+    # Mersenne primes and composites on both sides of the Miller-Rabin bound
+    for p in (61, 89, 107, 127, 521):
+        assert is_prime(2 ** p - 1)
+    for p in (67, 101, 523):
+        assert not is_prime(2 ** p - 1)
+    # Strong pseudoprime to every base 2..37, and a product of two large primes
+    assert not is_prime(318665857834031151167461)
+    assert not is_prime((2 ** 89 - 1) * (2 ** 107 - 1))
+    assert not is_prime((2 ** 61 - 1) ** 2)
+
+
+def test_strong_lucas_pseudoprimes():
+    # OEIS A217255: the odd composites that pass the strong Lucas test with Selfridge's parameters
+    known = [5459, 5777, 10877, 16109, 18971, 22499, 24569, 25199, 40309, 58519, 75077, 97439, 100127,
+             113573, 115639, 130139]
+    passing = [n for n in range(3, 130140, 2) if is_strong_lucas_probable_prime(n) and not is_prime(n)]
+    assert passing == known
+    assert all(is_strong_lucas_probable_prime(p) for p in primes_below(10000)[2:])
+
+
+def test_factorize_beyond_trial_division():
+    assert factorize(2 ** 64 + 1) == {274177: 1, 67280421310721: 1}
+    assert factorize(2 ** 67 - 1) == {193707721: 1, 761838257287: 1}
+    assert factorize((2 ** 31 - 1) ** 4) == {2 ** 31 - 1: 4}
+    assert factorize(2 ** 10 * 3 ** 5 * 65537 ** 2 * (2 ** 61 - 1)) == {2: 10, 3: 5, 65537: 2, 2 ** 61 - 1: 1}
+    assert factorize(1) == {}
+
+
+def test_factorize_matches_trial_division():
+    for n in range(1, 3000):
+        product = 1
+        for p, e in factorize(n).items():
+            assert is_prime(p)
+            product *= p ** e
+        assert product == n
+
+
+def test_pollard_brent_and_perfect_power():
+    for n in (1000003 * 1000033, 4294967291 * 4294967279, (2 ** 31 - 1) * (2 ** 61 - 1)):
+        d = pollard_brent(n)
+        assert 1 < d < n and n % d == 0
+    assert perfect_power(1000003 ** 6) == (1000003, 6)
+    assert perfect_power((1000003 * 1000033) ** 3) == (1000003 * 1000033, 3)
+    assert perfect_power(1000003 ** 2 * 1000033)[1] == 1
+
+
+def test_factorization_cache_is_shared():
+    clear_factorization_cache()
+    n = (2 ** 31 - 1) * (2 ** 61 - 1)
+    assert cached_factorization(n) == ((2 ** 31 - 1, 1), (2 ** 61 - 1, 1))
+    assert factorization_cache_info()['misses'] == 1 and factorization_cache_info()['hits'] == 0
+    # The manager's φ, λ and μ all reuse that one factorization
+    manager = NumberTheoryManager()
+    manager.n_value = n
+    assert manager.result('totient') == (2 ** 31 - 2) * (2 ** 61 - 2)
+    assert manager.result('carmichael') == math.lcm(2 ** 31 - 2, 2 ** 61 - 2)
+    assert manager.result('mobius') == 1
+    info = factorization_cache_info()
+    assert info['misses'] == 1 and info['hits'] >= 1
+    assert cached_factorization(n) == ((2 ** 31 - 1, 1), (2 ** 61 - 1, 1))
+    assert factorization_cache_info()['hits'] == info['hits'] + 1
+    clear_factorization_cache()
+    assert factorization_cache_info()['size'] == 0
+
+
+def test_carmichael_lambda_is_the_group_exponent():
+    for n in range(2, 300):
+        units = [a for a in range(1, n) if math.gcd(a, n) == 1]
+        exponent = next(e for e in range(1, n + 1) if all(pow(a, e, n) == 1 for a in units))
+        assert carmichael_lambda(n) == exponent
+
+
+@pytest.mark.parametrize("k", [1, 2, 3, 4])
+def test_knodel_matches_the_definition(k):
+    for n in range(k + 1, 2000):
+        assert is_knodel(n, k) == knodel_by_powers(n, k)
+
+
+def test_carmichael_numbers():
+    assert [n for n in range(2, 10000) if is_knodel(n) and not is_prime(n)] == \
+        [561, 1105, 1729, 2465, 2821, 6601, 8911]
+    assert is_knodel(9999109081, 1)
+
+
+def test_manager_uses_a_as_k():
+    manager = NumberTheoryManager()
+    manager.n_value = 4
+    manager.calculate_all()
+    assert (manager.results.knodel_check, manager.results.knodel_k) == (False, 1)
+    manager.a_value = 2
+    manager.calculate_all()
+    assert (manager.results.knodel_check, manager.results.knodel_k) == (True, 2)
+    # An a that can't be k leaves the check empty instead of testing k = 1
+    manager.a_value = 7
+    assert manager.result('knodel_check') is None and manager.result('knodel_k') is None
+
+
+def test_knodel_display_shows_k():
+    manager = NumberTheoryManager()
+    manager.n_value = 561
+    menu = NumVarMenuManager()
+    menu.activate(manager)
+    while menu.function_map[menu.cursor_pos] != "Knd":
+        menu.navigate('right')
+    assert menu.get_current_value() == "Yes (k=1)"
+    manager.a_value = 5
+    assert menu.get_current_value() == "No (k=5)"
+    manager.a_value = 561
+    assert menu.get_current_value() == "Needs 0<a<n"
+
+
+def order_by_steps(n, m):
+    value, order = n % m, 1
+    while value != 1:
+        value, order = value * n % m, order + 1
+    return order
+
+
+def test_order_and_generators_match_stepping():
+    for m in range(2, 200):
+        phi = sum(1 for a in range(1, m) if math.gcd(a, m) == 1)
+        for n in range(1, m):
+            if math.gcd(n, m) != 1:
+                assert not is_primitive_root(n, m)
+                continue
+            order = order_by_steps(n, m)
+            assert multiplicative_order(n, m) == order
+            assert is_primitive_root(n, m) == (order == phi)
+
+
+def test_order_for_a_large_modulus():
+    m = 1000000000039  # prime
+    order = multiplicative_order(3, m)
+    assert pow(3, order, m) == 1 and (m - 1) % order == 0
+    assert all(pow(3, order // q, m) != 1 for q in factorize(order))
+
+
+def pisano_by_steps(m):
+    a, b, period = 0, 1, 0
+    while True:
+        a, b, period = b, (a + b) % m, period + 1
+        if (a, b) == (0, 1):
+            return period
+
+
+def test_pisano_period_matches_stepping():
+    assert [pisano_period(m) for m in range(2, 2000)] == [pisano_by_steps(m) for m in range(2, 2000)]
+
+
+def test_pisano_period_for_a_large_modulus():
+    m = 10 ** 12
+    assert pisano_period(m) == 15 * 10 ** 11
+    assert fibonacci_pair(pisano_period(m), m) == (0, 1)
+
+
+def log_by_steps(a, n, m):
+    value = 1 % m
+    for x in range(2 * m):
+        if value == a % m:
+            return x
+        value = value * n % m
+    return None
+
+
+def test_discrete_log_matches_stepping():
+    for m in range(2, 80):
+        for n in range(m):
+            for a in range(m):
+                assert discrete_log(a, n, m) == log_by_steps(a, n, m), (a, n, m)
+
+
+def test_discrete_log_large_prime_order_subgroup():
+    # 2q + 1 with q prime and too large for the baby-step table, so this goes through rho
+    q, m = 17179869659, 34359739319
+    n = 4  # a square, so its order is q
+    x = 12345678901
+    assert discrete_log(pow(n, x, m), n, m) == x
+    assert discrete_log(11, n, m) is None  # 11 isn't a square mod m
+
+
+def test_discrete_log_smooth_modulus():
+    m = 2 ** 61 - 1
+    x = 1234567890123456789
+    assert discrete_log(pow(37, x, m), 37, m) == x % multiplicative_order(37, m)
+
+
+def test_results_are_calculated_on_demand():
+    manager = NumberTheoryManager()
+    manager.n_value, manager.m_value = 10, 13
+    assert manager.result('gcd') == 1
+    assert set(manager.calculated) == {'calculate_nm_dependent'}
+    assert manager.results.pisano_period is None
+    
+    manager.m_value = 12
+    assert manager.result('pisano_period') == 24
+    assert manager.result('gcd') == 2
+    
+    manager.a_value = 5
+    assert manager.calculated['calculate_nm_dependent'] == (10, 12)
+    assert manager.result('knodel_check') is False
+
+
+def test_jacobi_symbol_for_prime_modulus():
+    # The Legendre branch used to return before the Jacobi symbol was set
+    manager = NumberTheoryManager()
+    manager.n_value, manager.m_value = 2, 7
+    assert (manager.result('legendre_symbol'), manager.result('jacobi_symbol')) == (1, 1)
+    manager.n_value = 14
+    assert (manager.result('legendre_symbol'), manager.result('jacobi_symbol')) == (0, 0)
+
+
+def test_quadratic_residues_match_enumeration():
+    for m in range(2, 300):
+        squares = sorted({x * x % m for x in range(m)})
+        residues = QuadraticResidues(m)
+        assert len(residues) == len(squares)
+        assert [r for r in range(m) if r in residues] == squares
+        assert list(residues) == squares
+        assert residues.last() == squares[-1]
+
+
+def test_quadratic_residues_for_a_large_modulus():
+    m = 2 ** 4 * 3 ** 3 * 1000003
+    residues = QuadraticResidues(m)
+    assert len(residues) == 4 * 11 * 500002  # {0,1,4,9} mod 16, 11 squares mod 27, 0 and 500001 units mod p
+    assert 123456789 ** 2 % m in residues
+    page = residues.page(10 ** 6, 10)
+    assert len(page) == 10 and all(r in residues for r in page)
+    assert [r for r in range(page[0], page[-1] + 1) if r in residues] == page
+
+
+def test_quadratic_residue_display():
+    manager = NumberTheoryManager()
+    manager.n_value, manager.m_value = 3, 13
+    menu = NumVarMenuManager()
+    menu.activate(manager)
+    while menu.cursor_pos != 46:
+        menu.navigate('right')
+    assert menu.get_current_value() == "7: {0,1,3,4,…,12}"
+
+
+def test_square_roots_match_enumeration():
+    for m in range(2, 150):
+        for a in range(m):
+            roots = [x for x in range(m) if x * x % m == a]
+            assert square_roots(a, m) == roots
+            assert square_root_count(a, m) == len(roots)
+
+
+def test_square_roots_for_large_moduli():
+    p = 2 ** 64 - 59  # prime, ≡ 5 (mod 8)
+    q = 1000000000000001537  # prime, ≡ 1 (mod 64) so Tonelli-Shanks does real work
+    for modulus in (p, q, q ** 3, 2 ** 70, 1000003 * q):
+        for x in (3, 12345678987654321, 2 ** 61 + 7):
+            a = x * x % modulus
+            roots = square_roots(a, modulus)
+            assert x % modulus in roots and all(r * r % modulus == a for r in roots)
+    assert sqrt_mod_prime(3, 7) is None
+
+
+def test_chinese_remainder():
+    assert chinese_remainder([(2, 3), (3, 5), (2, 7)]) == (23, 105)
+    assert chinese_remainder([(3, 4), (1, 6)]) == (7, 12)
+    assert chinese_remainder([(1, 4), (2, 6)]) is None
+
+
+def test_square_root_display():
+    manager = NumberTheoryManager()
+    manager.n_value, manager.m_value = 4, 105
+    menu = NumVarMenuManager()
+    menu.activate(manager)
+    while menu.function_map[menu.cursor_pos] != "Sqr":
+        menu.navigate('right')
+    assert menu.get_current_value() == "8: {2,23,37,47,…,103}"
+
+
+def test_primitive_roots_and_generators():
+    for m in range(2, 300):
+        generators = [g for g in range(1, m) if is_primitive_root(g, m)]
+        assert primitive_root(m) == (generators[0] if generators else None)
+        assert sorted(generator_array(m)) == generators
+
+
+def test_primitive_root_display():
+    manager = NumberTheoryManager()
+    manager.n_value, manager.m_value = 4, 1000000000000001537
+    menu = NumVarMenuManager()
+    menu.activate(manager)
+    menu.navigate('left')
+    assert (menu.function_map[menu.cursor_pos], menu.get_current_value()) == ("PRt", primitive_root(manager.m_value))
+    manager.m_value = 8
+    assert menu.get_current_value() is None
+
+
+def test_primitive_root_for_a_large_prime():
+    p = 1000000000000001537
+    g = primitive_root(p)
+    assert is_primitive_root(g, p) and not any(is_primitive_root(c, p) for c in range(2, g))
+    first = list(itertools.islice(iter_generators(p), 5))
+    assert first[0] == g and all(is_primitive_root(c, p) for c in first)
+
+@pytest.mark.parametrize("bits", [8, 60, 200, 3000, 12000])
+def test_extended_gcd_matches_math_gcd(bits):
+    rng = __import__("random").Random(bits)
+    for _ in range(10):
+        common = rng.choice([1, 6, rng.getrandbits(bits // 4 + 1) | 1])
+        a, b = rng.getrandbits(bits) * common, rng.getrandbits(rng.randint(1, bits)) * common
+        for u, v in ((a, b), (b, a), (-a, b), (a, -b), (a, 0)):
+            g, x, y = extended_gcd(u, v)
+            assert g == math.gcd(u, v)
+            assert u * x + v * y == g
+
+def test_bezout_on_consecutive_fibonacci():
+    # Worst case for Euclid: every quotient is 1, thousands of steps deep
+    fib = [0, 1]
+    while len(fib) < 30001:
+        fib.append(fib[-1] + fib[-2])
+    for k in (1000, 30000):
+        x, y = bezout_coefficients(fib[k], fib[k - 1])
+        assert fib[k] * x + fib[k - 1] * y == 1
+        assert abs(x) <= fib[k - 1] and abs(y) <= fib[k]
+
+def test_bezout_picks_smallest_pair():
+    for a, b in [(561, 1001), (12, 18), (1000, 41), (7, 7), (1, 5)]:
+        g = math.gcd(a, b)
+        best = min((abs(x) + abs((g - a * x) // b), abs(x)) for x in range(-b, b + 1) if (g - a * x) % b == 0)
+        x, y = bezout_coefficients(a, b)
+        assert (abs(x) + abs(y), abs(x)) == best
+
+def test_manager_gcd_lcm_bezout_inverse():
+    manager = NumberTheoryManager()
+    manager.n_value, manager.m_value = 561, 1001
+    assert (manager.result('gcd'), manager.result('lcm'), manager.result('bezout')) == (11, 51051, (25, -14))
+    assert manager.result('modular_inverse') is None
+    manager.m_value = 2 ** 127 - 1
+    inverse = manager.result('modular_inverse')
+    assert 561 * inverse % manager.m_value == 1
+
+def test_discrete_log_outside_subgroup_in_non_cyclic_group():
+    # Both factors have p - 1 divisible by the large prime q = 8589934631, so the
+    # order-q elements form a non-cyclic group; a has order q but isn't a power of n
+    p1, p2 = 17179869263, 927712940149
+    g1, g2 = primitive_root(p1), primitive_root(p2)
+    n, _ = chinese_remainder([(g1, p1), (pow(g2, 108, p2), p2)])
+    a, _ = chinese_remainder([(1, p1), (pow(g2, 324, p2), p2)])
+    m = p1 * p2
+    assert pow(a, multiplicative_order(n, m), m) == 1
+    assert discrete_log(a, n, m) is None
+    # A real power of n is still found
+    assert discrete_log(pow(n, 123456789012, m), n, m) == 123456789012 % multiplicative_order(n, m)
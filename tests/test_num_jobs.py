@@ -0,0 +1,49 @@
+import time
+from calculator.logic.num import NumberTheoryManager
+from calculator.logic.num_jobs import NumberTheoryJobs, PENDING
+from calculator.logic.numvar_menu import NumVarMenuManager
+
+
+def wait_for(menu, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not menu.poll():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_results_arrive_from_the_worker():
+    jobs = NumberTheoryJobs()
+    try:
+        manager = NumberTheoryManager()
+        manager.n_value, manager.m_value = 561, 1001
+        menu = NumVarMenuManager(jobs=jobs)
+        assert menu.activate(manager)[1] == PENDING
+        wait_for(menu)
+        assert menu.get_current_value() == "3 · 11 · 17"
+        assert menu.navigate('right')[1] == 8  # same calculation, already stored
+        assert jobs.job is None
+    finally:
+        jobs.stop()
+
+
+def test_changing_inputs_discards_the_running_job():
+    jobs = NumberTheoryJobs()
+    try:
+        manager = NumberTheoryManager()
+        manager.n_value = 2 ** 64 + 1
+        menu = NumVarMenuManager(jobs=jobs)
+        assert menu.activate(manager)[1] == PENDING
+        manager.n_value = 12
+        assert menu.get_current_value() == PENDING  # resubmitted for the new n
+        wait_for(menu)
+        assert menu.get_current_value() == "2² · 3"
+    finally:
+        jobs.stop()
+
+
+def test_cancel_kills_the_worker():
+    jobs = NumberTheoryJobs()
+    jobs.submit('calculate_n_dependent', (2 ** 127 - 1, None, None))
+    process = jobs.process
+    jobs.cancel()
+    assert jobs.job is None and jobs.process is None and not process.is_alive()
@@ -0,0 +1,37 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+from calculator.logic.num import NumberTheoryManager
+from calculator.logic.num_table import ArithmeticTable, TABLE_FIELDS, arithmetic_table
+
+
+def expected(n):
+    manager = NumberTheoryManager()
+    manager.n_value = n
+    manager.calculate_n_dependent()
+    return {name: getattr(manager.results, name) for name in TABLE_FIELDS}
+
+
+def test_table_matches_the_single_value_calculation():
+    table = arithmetic_table(3000)
+    assert len(table) == 2999
+    for n in range(1, 3000):
+        assert table[n] == expected(n), n
+
+
+def test_interval_and_bounds():
+    table = arithmetic_table(10 ** 5, start=99000)
+    assert table[99991] == expected(99991)
+    assert table[10 ** 5 - 1] == expected(10 ** 5 - 1)
+    with pytest.raises(IndexError):
+        table[10 ** 5]
+    assert len(arithmetic_table(10)) == 9
+
+
+def test_save_and_load(tmp_path):
+    table = arithmetic_table(500, start=100)
+    path = tmp_path / "table.npz"
+    table.save(path)
+    loaded = ArithmeticTable.load(path)
+    assert (loaded.start, loaded.stop) == (100, 500)
+    assert all(loaded[n] == table[n] for n in range(100, 500))
@@ -0,0 +1,116 @@
+import pytest
+from calculator.logic.evaluator import evaluate_expression
+
+DEG = {"angle_mode": "deg"}
+
+# Keypad syntax with the results the original regex-rewriting evaluator gave
+KEYPAD_SYNTAX = [
+    ("7÷2", {}, "3.5"),
+    ("2*3+4", {}, "10"),
+    ("2^10", {}, "1024"),
+    ("2^3^2", {}, "512"),
+    ("4^(1÷2)", {}, "2"),
+    ("X√(16)", {}, "4"),
+    ("3X√(27)", {}, "3"),
+    ("√(16)", {}, "4"),
+    ("(-)2^2", {}, "-4"),
+    ("(-)3+5", {}, "2"),
+    ("2-(-)3", {}, "5"),
+    ("(-)(2+3)", {}, "-5"),
+    ("5 nPr 2", {}, "20"),
+    ("5 nCr 2", {}, "10"),
+    ("5nPr2+1", {}, "21"),
+    ("10 nCr 3 * 2", {}, "240"),
+    ("5!", {}, "120"),
+    ("3!+2", {}, "8"),
+    ("50%", {}, "0.5"),
+    ("30°0'0\"", DEG, "30"),
+    ("sin(30°0'0\")", {}, "0.5"),
+    ("1.5►DMS", DEG, "1°30'0\""),
+    ("1r", DEG, "57.29577951"),
+    ("100g", DEG, "90"),
+    ("sin(90)", DEG, "1"),
+    ("cos(100)", {"angle_mode": "grd"}, "0"),
+    ("sin^(-1)(1)", DEG, "90"),
+    ("sin(1)", {"hyp": True}, "1.175201194"),
+    ("R►Pr(3,4)", {}, "5"),
+    ("R►Pθ(1,1)", DEG, "45"),
+    ("P►Rx(2,60)", DEG, "1"),
+    ("P►Ry(2,30)", DEG, "1"),
+    ("1/4►f↔d", {}, "1/4"),
+    ("0.75>f<>d", {}, "3/4"),
+    ("3┘1/4", {}, "3┘1/4"),
+    ("3┘1/4►f↔d", {}, "3.25"),
+    ("7/4►A B/C↔D/E", {}, "1┘3/4"),
+    ("3┘1/4►A B/C↔D/E", {}, "13/4"),
+    ("1.5E3", {}, "1500"),
+    ("(1+2", {}, "3"),
+    ("sin(90", DEG, "1"),
+    (".5+.25", {}, "0.75"),
+    ("log(1000)", {}, "3"),
+    ("ln(e)", {}, "1"),
+    ("abs((-)5)", {}, "5"),
+]
+
+# Inputs the keypad builds around Ans and the memory registers, with the
+# results the text-substitution evaluator gave for the same values
+ANS_INPUTS = [
+    ("AnsX√(8", 3, "2"),
+    ("AnsX√(8)", 3, "2"),
+    ("AnsE2", 5, "500"),
+    ("AnsE(-)2", 5, "0.05"),
+    ("Ans^(-1)", 4, "0.25"),
+    ("Ans^2", 4, "16"),
+    ("Ans÷2", 4, "2"),
+    ("Ans!", 4, "24"),
+    ("Ans nPr 2", 5, "20"),
+    ("Ans*2E3", 2, "4000"),
+]
+
+REGISTERS = {'a': 3, 'b': 0, 'c': 0, 'd': 0, 'e': 10, 'r': 0}
+
+REGISTER_INPUTS = [
+    ("AX√(8", "2"),
+    ("AE2", "300"),
+    ("E+2", "12"),
+    ("A*E+2", "32"),
+]
+
+
+@pytest.mark.parametrize("expression, settings, expected", KEYPAD_SYNTAX)
+def test_keypad_syntax(expression, settings, expected):
+    assert evaluate_expression(expression, **settings)['value'] == expected
+
+
+def test_nested_trig_converts_each_argument():
+    # The old rewrite only converted the outer sin's argument, giving 0.8939966636
+    assert evaluate_expression("sin(cos(0)*90)", angle_mode="deg")['value'] == "1"
+
+
+def test_store_suffix():
+    result = evaluate_expression("2+3►a")
+    assert (result['value'], result['store_to']) == ("5", "a")
+
+
+@pytest.mark.parametrize("expression", ["__import__", "foo(1)", "1.2.3", "", "2E"])
+def test_rejected_input(expression):
+    assert evaluate_expression(expression)['value'].startswith("Error: ")
+
+
+@pytest.mark.parametrize("expression, ans, expected", ANS_INPUTS)
+def test_ans_inputs(expression, ans, expected):
+    assert evaluate_expression(expression, ans=ans)['value'] == expected
+
+
+@pytest.mark.parametrize("expression, expected", REGISTER_INPUTS)
+def test_register_inputs(expression, expected):
+    assert evaluate_expression(expression, registers=REGISTERS)['value'] == expected
+
+
+def test_store_ans():
+    result = evaluate_expression("Ans►a", ans=7)
+    assert (result['value'], result['store_to']) == ("7", "a")
+
+@pytest.mark.parametrize("expression", ["1E400", "2*1E309", "1.5E999+1"])
+def test_overflowing_literal(expression):
+    assert evaluate_expression(expression)['value'] == "Error: too large"
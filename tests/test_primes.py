@@ -0,0 +1,51 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+from calculator.logic import primes
+from calculator.logic.evaluator import evaluate_expression
+from calculator.logic.num import primes_below
+
+LIMIT = 100000
+PRIMES = primes_below(LIMIT)
+
+
+@pytest.fixture
+def sieve(tmp_path, monkeypatch):
+    # Small segments, so queries cross several of them
+    monkeypatch.setattr(primes, "SEGMENT_ODDS", 1 << 12)
+    monkeypatch.setattr(primes, "SEGMENT_BYTES", (1 << 12) // 8)
+    sieve = primes.PrimeSieve(tmp_path)
+    monkeypatch.setattr(primes, "default_sieve", lambda: sieve)
+    return sieve
+
+
+def test_primes_in(sieve):
+    assert sieve.primes_in(0, LIMIT).tolist() == PRIMES
+    assert sieve.primes_in(8190, 8300).tolist() == [p for p in PRIMES if 8190 <= p < 8300]
+    assert sieve.primes_in(10, 10).size == 0
+
+
+def test_prime_pi_and_nth_prime(sieve):
+    for x in (0, 1, 2, 3, 8191, 8192, 8193, 16383, 99991, 99999):
+        assert sieve.prime_pi(x) == sum(1 for p in PRIMES if p <= x)
+    for k in (1, 2, 3, 1000, 1028, 1029, len(PRIMES)):
+        assert sieve.nth_prime(k) == PRIMES[k - 1]
+
+
+def test_next_prime(sieve):
+    assert [sieve.next_prime(n) for n in (-5, 0, 1, 2, 3, 8190, 99990)] == [2, 2, 2, 3, 5, 8191, 99991]
+
+
+def test_segments_are_reused_from_disk(sieve, tmp_path):
+    sieve.prime_pi(LIMIT)
+    reopened = primes.PrimeSieve(tmp_path)
+    assert reopened.segments() == sieve.segments()
+    reopened.sieve_segment = None  # a cache miss would fail here
+    assert reopened.prime_pi(LIMIT - 1) == len(PRIMES)
+
+
+def test_calculator_functions(sieve):
+    assert evaluate_expression("primepi(100)")['value'] == "25"
+    assert evaluate_expression("nthprime(10)+1")['value'] == "30"
+    assert evaluate_expression("nextprime(2^10)")['value'] == "1031"
+    assert evaluate_expression("primepi(2.5)")['value'].startswith("Error: ")
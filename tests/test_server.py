@@ -0,0 +1,69 @@
+import asyncio
+import json
+import pytest
+from calculator.server import CalculatorServer, INVALID_PARAMS, METHOD_NOT_FOUND, PARSE_ERROR, SERVER_ERROR, TIMEOUT_ERROR, number_theory
+
+# Product of two 61/62-bit primes: slow enough to factor that it always times out
+HARD_SEMIPRIME = 2305843009213693951 * 4611686018427388039
+
+
+@pytest.fixture
+def server():
+    calculator_server = CalculatorServer(workers=1, timeout=5)
+    yield calculator_server
+    calculator_server.close()
+
+
+def dispatch(server, request):
+    line = request if isinstance(request, str) else json.dumps(request)
+    return asyncio.run(server.dispatch(line.encode("utf-8")))
+
+
+def test_evaluate_round_trip(server):
+    response = dispatch(server, {"jsonrpc": "2.0", "id": 7, "method": "evaluate",
+                                 "params": {"expression": "sin(90)", "angle_mode": "deg"}})
+    assert response["id"] == 7
+    assert response["result"]["value"] == "1"
+
+
+def test_number_theory_round_trip(server):
+    response = dispatch(server, {"jsonrpc": "2.0", "id": 1, "method": "number_theory",
+                                 "params": {"n": 561, "m": 1001, "fields": ["gcd", "bezout", "quadratic_residues"]}})
+    result = response["result"]
+    assert set(result) == {"gcd", "bezout", "quadratic_residues"}
+    assert result["gcd"] == 11 and list(result["bezout"]) == [25, -14]
+    assert result["quadratic_residues"]["first"] == 0
+
+
+def test_number_theory_only_calculates_requested_fields():
+    # A factorization that would never finish isn't touched when only gcd is asked for
+    result = number_theory({"n": HARD_SEMIPRIME, "m": 10, "fields": ["gcd"]})
+    assert result == {"gcd": 1}
+
+
+def test_errors(server):
+    assert dispatch(server, "{not json")["error"]["code"] == PARSE_ERROR
+    assert dispatch(server, {"jsonrpc": "2.0", "id": 2, "method": "nope"})["error"]["code"] == METHOD_NOT_FOUND
+    response = dispatch(server, {"jsonrpc": "2.0", "id": 3, "method": "number_theory",
+                                 "params": {"n": 5, "fields": ["bogus"]}})
+    assert response["error"]["code"] == INVALID_PARAMS
+
+
+def test_timeout_replaces_worker(server):
+    response = dispatch(server, {"jsonrpc": "2.0", "id": 4, "method": "number_theory", "timeout": 0.3,
+                                 "params": {"n": HARD_SEMIPRIME, "fields": ["factorization"]}})
+    assert response["error"]["code"] == TIMEOUT_ERROR
+    # The replacement worker answers the next request
+    response = dispatch(server, {"jsonrpc": "2.0", "id": 5, "method": "evaluate", "params": {"expression": "2+3"}})
+    assert response["result"]["value"] == "5"
+
+
+def test_dead_worker_is_replaced(server):
+    worker = server.pool.idle.get_nowait()
+    worker.process.kill()
+    worker.process.join()
+    server.pool.idle.put_nowait(worker)
+    response = dispatch(server, {"jsonrpc": "2.0", "id": 6, "method": "evaluate", "params": {"expression": "1+1"}})
+    assert response["error"]["code"] == SERVER_ERROR
+    response = dispatch(server, {"jsonrpc": "2.0", "id": 7, "method": "evaluate", "params": {"expression": "1+1"}})
+    assert response["result"]["value"] == "2"
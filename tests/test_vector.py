@@ -0,0 +1,45 @@
+import math
+import pytest
+
+np = pytest.importorskip("numpy")
+from calculator.logic.vector import evaluate_vectorized
+from calculator.logic.evaluator import evaluate_expression
+
+
+def test_combinations_match_exact_values():
+    x = np.arange(7, 60)
+    assert evaluate_vectorized("x nCr 7", x).tolist() == [math.comb(n, 7) for n in range(7, 60)]
+    assert evaluate_vectorized("x nPr 4", x).tolist() == [math.perm(n, 4) for n in range(7, 60)]
+
+
+def test_large_counts_do_not_allocate_by_size():
+    result = evaluate_vectorized("x nCr 3", [1e9, 2, 2.5])
+    assert result[0] == pytest.approx(math.comb(10 ** 9, 3), rel=1e-5)
+    assert np.isnan(result[1:]).all()
+
+
+# Expressions, settings and inputs where the vector and scalar evaluators must agree
+SCALAR_CASES = [
+    ("sin(x)+cos(x)*tan(x)", {"angle_mode": "deg"}, [0, 30, 45, 60, 89.5, 180, 270, 400]),
+    ("sin(x)^2", {"angle_mode": "grd"}, [0, 50, 100, 150, 200, 399]),
+    ("sin^(-1)(x)+cos^(-1)(x)", {"angle_mode": "deg"}, [0, 0.25, 0.5, 1]),
+    ("tan^(-1)(x)", {"angle_mode": "grd"}, [0, 1, 3.5, 1000]),
+    ("sin(x)-cos(x)+tan(x)", {"hyp": True}, [0, 0.5, 1, 2.5]),
+    ("log(x)+ln(x)", {}, [1, 2, 10, 12345.678]),
+    ("√(x)+3X√(x)", {}, [0, 1, 2, 16, 27, 1e6]),
+    ("x!+x nPr 2", {}, [0, 1, 2, 5, 10, 20]),
+    ("sin(x°30'0\")", {"angle_mode": "deg"}, [0, 29, 44, 89]),
+    ("x°15'0\"", {"angle_mode": "rad"}, [0, 1, 90]),
+]
+
+
+@pytest.mark.parametrize("expression, settings, inputs", SCALAR_CASES)
+def test_matches_scalar_evaluation(expression, settings, inputs):
+    vector = evaluate_vectorized(expression, inputs, **settings)
+    for value, result in zip(inputs, vector):
+        scalar = evaluate_expression(expression.replace("x", f"({value!r})"), **settings)['raw_value']
+        if scalar is None:
+            # A scalar error shows up as NaN in its slot
+            assert np.isnan(result), (expression, value)
+        else:
+            assert result == pytest.approx(float(scalar), rel=1e-9, abs=1e-12), (expression, value)